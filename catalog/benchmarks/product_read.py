@@ -0,0 +1,69 @@
+"""
+Сравнение стоимости чтения страницы продуктов: ORM-путь
+(ProductModel -> ProductDM -> ProductDTO) против Core-проекции ProductReader.
+
+Зависимости берутся из DI-контейнера приложения, поэтому нужны
+те же настройки окружения, что и для сервиса. Запуск из каталога catalog/
+на базе с данными:
+
+    python -m benchmarks.product_read --page-size 100 --rounds 200
+"""
+
+import argparse
+import time
+from typing import Callable, List
+
+import msgspec
+from container import container
+from dishka import Container
+from products.application.dto import ProductDTO
+from products.application.interfaces import (
+    ProductReaderProtocol,
+    ProductRepositoryProtocol,
+)
+
+
+def _orm_page(request: Container, page_size: int) -> List[ProductDTO]:
+    repo = request.get(ProductRepositoryProtocol)
+    return ProductDTO.from_iterable(repo.get_all(limit=page_size))
+
+
+def _projection_page(request: Container, page_size: int) -> List[ProductDTO]:
+    return request.get(ProductReaderProtocol).get_page(limit=page_size)
+
+
+def _measure(
+    read: Callable[[Container, int], List[ProductDTO]],
+    page_size: int,
+    rounds: int,
+) -> tuple[float, int]:
+    """Среднее время на строку (мкс) с сериализацией в JSON, как во вьюхе."""
+    rows = 0
+    elapsed = 0.0
+    for _ in range(rounds):
+        # новый REQUEST-скоуп на раунд — как новый запрос, identity map пустая
+        with container() as request:
+            started = time.perf_counter()
+            items = read(request, page_size)
+            msgspec.json.encode(items)
+            elapsed += time.perf_counter() - started
+        rows += len(items)
+    return (elapsed / rows * 1e6 if rows else 0.0), rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    args = parser.parse_args()
+
+    paths = {"orm": _orm_page, "projection": _projection_page}
+    for name, read in paths.items():
+        _measure(read, args.page_size, args.warmup)
+        per_row, rows = _measure(read, args.page_size, args.rounds)
+        print(f"{name:<12} {per_row:8.1f} us/row  ({rows} rows)")
+
+
+if __name__ == "__main__":
+    main()
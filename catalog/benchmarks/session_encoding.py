@@ -0,0 +1,116 @@
+"""
+Сравнение кодирования сессии: прежний JSON (json.dumps(asdict(...))
+и разбор обратно в SessionData) против полей хэша RedisSessionBackend
+(msgpack на каждый ключ). Типичная сессия — несколько скалярных ключей,
+большая — корзина из сотен позиций с вложенными словарями.
+
+Redis и DI-контейнер не нужны. Запуск из каталога catalog/:
+
+    python -m benchmarks.session_encoding --rounds 20000
+"""
+
+import argparse
+import json
+import time
+import uuid
+from typing import Any, Callable, Optional
+from uuid import UUID
+
+import msgspec
+from main.domain.entities import SessionData
+from main.infrastructure.sessions import decode_session, encode_session
+
+_SESSION_ID = uuid.uuid4()
+
+
+def _json_dump(data: SessionData) -> bytes:
+    return json.dumps(msgspec.structs.asdict(data), default=str).encode()
+
+
+def _json_load(raw: bytes) -> SessionData:
+    fields = json.loads(raw.decode("utf-8"))
+    return SessionData(user_id=UUID(fields["user_id"]), data=fields["data"])
+
+
+def _hash_dump(data: SessionData) -> dict[bytes, bytes]:
+    # как поля вернутся из HGETALL
+    return {field.encode(): value for field, value in encode_session(data).items()}
+
+
+def _hash_load(raw: dict[bytes, bytes]) -> Optional[SessionData]:
+    return decode_session(_SESSION_ID, raw)
+
+
+def _size(raw: bytes | dict[bytes, bytes]) -> int:
+    if isinstance(raw, bytes):
+        return len(raw)
+    return sum(len(field) + len(value) for field, value in raw.items())
+
+
+def _typical() -> SessionData:
+    return SessionData(
+        user_id=uuid.uuid4(),
+        data={"role": "client", "lang": "ru", "last_seen": time.time()},
+    )
+
+
+def _large(items: int) -> SessionData:
+    cart = [
+        {
+            "product_id": i,
+            "quantity": i % 5 + 1,
+            "price": 10.5 + i,
+            "options": {"color": "black", "size": "M", "gift": i % 2 == 0},
+        }
+        for i in range(items)
+    ]
+    return SessionData(
+        user_id=uuid.uuid4(),
+        data={"cart": cart, "recent": list(range(items)), "lang": "ru"},
+    )
+
+
+def _measure(
+    dump: Callable[[SessionData], Any],
+    load: Callable[[Any], Any],
+    session: SessionData,
+    rounds: int,
+) -> tuple[float, float, int]:
+    """Среднее время кодирования и разбора (мкс) и размер записи в байтах."""
+    raw = dump(session)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        dump(session)
+    encode = (time.perf_counter() - started) / rounds * 1e6
+    started = time.perf_counter()
+    for _ in range(rounds):
+        load(raw)
+    decode = (time.perf_counter() - started) / rounds * 1e6
+    return encode, decode, _size(raw)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=20000)
+    parser.add_argument("--cart-items", type=int, default=300)
+    args = parser.parse_args()
+
+    payloads = {"typical": _typical(), "large": _large(args.cart_items)}
+    codecs: dict[str, tuple[Callable[[SessionData], Any], Callable[[Any], Any]]] = {
+        "json": (_json_dump, _json_load),
+        "hash": (_hash_dump, _hash_load),
+    }
+    for payload, session in payloads.items():
+        # большая сессия на порядки тяжелее — меньше раундов
+        rounds = args.rounds if payload == "typical" else max(args.rounds // 100, 1)
+        for codec, (dump, load) in codecs.items():
+            assert load(dump(session)) == session
+            encode, decode, size = _measure(dump, load, session, rounds)
+            print(
+                f"{payload:<8} {codec:<8} encode {encode:8.2f} us"
+                f"  decode {decode:8.2f} us  {size:7d} bytes"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Накладные расходы SessionMiddleware на запрос до и после ленивой
+загрузки сессии: время и число команд Redis на одной и той же смеси
+запросов — аноним без cookie, который сессию не трогает (бот, чтение
+каталога), клиент с cookie, который сессию только читает, и клиент
+с cookie, который в неё пишет.
+
+«eager» — прежняя схема: сессия читается на каждом запросе, новая
+заводится в Redis сразу вместе с гостевым ключом, изменённая
+перезаписывается целиком одной JSON-строкой. «lazy» — текущий
+SessionMiddleware.
+
+Нужны те же настройки окружения, что и для сервиса (Redis из конфига).
+Запуск из каталога catalog/:
+
+    python -m benchmarks.session_middleware --requests 5000
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import time
+from typing import Any, Callable, Optional, cast
+from uuid import UUID, uuid4
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "main.settings")
+django.setup()
+
+from container import container  # noqa: E402
+from django.contrib.sessions.backends.base import SessionBase  # noqa: E402
+from django.http import HttpRequest, HttpResponse  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from main.infrastructure.middleware import SessionMiddleware  # noqa: E402
+from main.infrastructure.sessions import GUEST_COOKIE  # noqa: E402
+from redis import Redis  # noqa: E402
+
+View = Callable[[HttpRequest], HttpResponse]
+Middleware = Callable[[HttpRequest], HttpResponse]
+
+
+class _EagerSession(dict[str, Any]):
+    modified = False
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        super().__setitem__(key, value)
+        self.modified = True
+
+
+class EagerSessionMiddleware:
+    """Прежний middleware: сессия загружается до вьюхи на каждом запросе."""
+
+    def __init__(self, get_response: View, redis: Redis) -> None:
+        self.get_response = get_response
+        self._redis = redis
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        sid: Optional[UUID] = None
+        data: Optional[dict[str, Any]] = None
+        if cookie := request.COOKIES.get(GUEST_COOKIE):
+            with contextlib.suppress(ValueError):
+                sid = UUID(cookie)
+                raw = cast(Optional[bytes], self._redis.get(sid.hex))
+                data = None if raw is None else json.loads(raw)
+        if sid is None or data is None:
+            # сессия и гостевой ключ заводились сразу, даже для ботов
+            sid, data = uuid4(), {}
+            self._redis.set(sid.hex, json.dumps(data), ex=3600)
+            self._redis.set(f"guest:{sid.hex}", "{}", ex=1800)
+
+        session = _EagerSession(data)
+        request.session = cast(SessionBase, session)
+        response = self.get_response(request)
+        if session.modified:
+            self._redis.set(sid.hex, json.dumps(session), ex=3600)
+        if cookie != sid.hex:
+            response.set_cookie(GUEST_COOKIE, sid.hex, httponly=True)
+        return response
+
+
+def _catalog_read(request: HttpRequest) -> HttpResponse:
+    return HttpResponse(b"[]")
+
+
+def _session_read(request: HttpRequest) -> HttpResponse:
+    request.session.get("cart")
+    return HttpResponse(b"[]")
+
+
+def _session_write(request: HttpRequest) -> HttpResponse:
+    request.session["last_seen"] = time.time()
+    return HttpResponse(b"[]")
+
+
+def _commands(redis: Redis) -> int:
+    stats = cast(dict[str, Any], redis.info("stats"))
+    return int(stats["total_commands_processed"])
+
+
+def _seed_cookie(make: Callable[[View], Middleware]) -> Optional[str]:
+    """Cookie клиента, у которого в сессии уже есть данные."""
+    response = make(_session_write)(RequestFactory().get("/products/"))
+    cookie = response.cookies.get(GUEST_COOKIE)
+    return None if cookie is None else cookie.value
+
+
+def _measure(
+    middleware: Middleware,
+    redis: Redis,
+    requests: int,
+    cookie: Optional[str],
+) -> tuple[float, float]:
+    """Среднее время (мкс) и число команд Redis на запрос."""
+    factory = RequestFactory()
+    if cookie is not None:
+        factory.cookies[GUEST_COOKIE] = cookie
+
+    before = _commands(redis)
+    elapsed = 0.0
+    for _ in range(requests):
+        request = factory.get("/products/")
+        started = time.perf_counter()
+        middleware(request)
+        elapsed += time.perf_counter() - started
+    # сам INFO тоже считается командой
+    commands = _commands(redis) - before - 1
+    return elapsed / requests * 1e6, commands / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    redis = container.get(Redis)
+    middlewares: dict[str, Callable[[View], Middleware]] = {
+        "eager": lambda view: EagerSessionMiddleware(view, redis),
+        # DishkaRequest отличается от HttpRequest только аннотациями
+        "lazy": lambda view: cast(Middleware, SessionMiddleware(view)),
+    }
+    # вьюха и то, приходит ли клиент с cookie своей сессии
+    scenarios: dict[str, tuple[View, bool]] = {
+        "anonymous": (_catalog_read, False),
+        "session read": (_session_read, True),
+        "session write": (_session_write, True),
+    }
+    for scenario, (view, with_cookie) in scenarios.items():
+        for name, make in middlewares.items():
+            cookie = _seed_cookie(make) if with_cookie else None
+            per_request, commands = _measure(make(view), redis, args.requests, cookie)
+            print(
+                f"{scenario:<14} {name:<6} {per_request:8.1f} us/request"
+                f"  {commands:.2f} redis cmd"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 import os
 from pathlib import Path
+from typing import Literal, cast
 
 import msgspec
+from products.application.types import COUNT_MODES, CountMode
 
 
 class SecretConfig(msgspec.Struct):
@@ -34,11 +36,91 @@ class RedisConfig(msgspec.Struct):
     max_conn: int
 
 
+class CachePolicy(msgspec.Struct):
+    """
+    Политика пересчёта для семейства ключей SingleFlightCache:
+    lock — один воркер пересчитывает под коротким локом, остальные
+    отдают устаревшее значение (до stale_ttl секунд после ttl);
+    xfetch — вероятностный досрочный пересчёт (коэффициент beta);
+    off — без кэширования.
+    """
+
+    strategy: Literal["lock", "xfetch", "off"] = "lock"
+    ttl: int = 30
+    stale_ttl: int = 300
+    lock_ttl: float = 5.0
+    beta: float = 1.0
+
+
+class CacheConfig(msgspec.Struct):
+    l1_size: int
+    l1_ttl: float
+    lookup_size: int
+    lookup_ttl: int
+    product_detail_ttl: int
+    missing_ttl: int
+    response_ttl: int
+    # Cache-Control публичных GET: сколько ответ свеж и сколько CDN
+    # может отдавать его устаревшим, обновляя в фоне
+    http_max_age: int
+    http_stale_while_revalidate: int
+    policies: dict[str, CachePolicy]
+    # страницы списка без курсора, которые кэшируются; глубже и по курсору
+    # запросы идут в БД, чтобы обход каталога не раздувал Redis
+    list_cached_pages: int
+
+
+class CatalogConfig(msgspec.Struct):
+    count_mode: CountMode
+    count_cache_ttl: int
+
+
+class WarmupConfig(msgspec.Struct):
+    on_startup: bool
+    top: int  # сколько самых запрашиваемых карточек греть
+    batch_size: int
+    concurrency: int
+    rate: float  # запросов к БД в секунду на весь прогрев
+    list_pages: int
+    list_page_size: int
+    # доля обращений к карточкам, попадающая в статистику, и её окно
+    hot_sample_rate: float
+    hot_window_hours: int
+
+
+class OutboxConfig(msgspec.Struct):
+    batch_size: int
+    poll_interval: float
+
+
+DEFAULT_CACHE_POLICIES = {
+    "products:list": CachePolicy(strategy="lock", ttl=30),
+}
+
+
+def _load_policies(raw: str) -> dict[str, CachePolicy]:
+    """JSON вида {"products:list": {"strategy": "xfetch", "ttl": 60}}."""
+    overrides = msgspec.json.decode(raw, type=dict[str, CachePolicy]) if raw else {}
+    return DEFAULT_CACHE_POLICIES | overrides
+
+
+def _load_count_mode(raw: str) -> CountMode:
+    if raw not in COUNT_MODES:
+        raise ValueError(
+            f"Unknown CATALOG_COUNT_MODE: {raw!r}, expected one of {COUNT_MODES}"
+        )
+    return cast(CountMode, raw)
+
+
 class Config(msgspec.Struct):
     secret: SecretConfig
     static: StaticConfig
     postgres: PostgresConfig
     redis: RedisConfig
+    cache: CacheConfig
+    catalog: CatalogConfig
+    outbox: OutboxConfig
+    warmup: WarmupConfig
 
     @classmethod
     def load(cls) -> "Config":
@@ -74,4 +156,38 @@ class Config(msgspec.Struct):
                 password=os.getenv("REDIS_PASSWORD", ""),
                 max_conn=int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
             ),
+            cache=CacheConfig(
+                l1_size=int(os.getenv("CACHE_L1_SIZE", "1000")),
+                l1_ttl=float(os.getenv("CACHE_L1_TTL", "30")),
+                lookup_size=int(os.getenv("CACHE_LOOKUP_SIZE", "10000")),
+                lookup_ttl=int(os.getenv("CACHE_LOOKUP_TTL", "3600")),
+                product_detail_ttl=int(os.getenv("CACHE_PRODUCT_DETAIL_TTL", "300")),
+                missing_ttl=int(os.getenv("CACHE_MISSING_TTL", "60")),
+                response_ttl=int(os.getenv("CACHE_RESPONSE_TTL", "60")),
+                http_max_age=int(os.getenv("CACHE_HTTP_MAX_AGE", "30")),
+                http_stale_while_revalidate=int(
+                    os.getenv("CACHE_HTTP_STALE_WHILE_REVALIDATE", "300")
+                ),
+                policies=_load_policies(os.getenv("CACHE_POLICIES", "")),
+                list_cached_pages=int(os.getenv("CACHE_LIST_PAGES", "10")),
+            ),
+            catalog=CatalogConfig(
+                count_mode=_load_count_mode(os.getenv("CATALOG_COUNT_MODE", "exact")),
+                count_cache_ttl=int(os.getenv("CATALOG_COUNT_CACHE_TTL", "60")),
+            ),
+            outbox=OutboxConfig(
+                batch_size=int(os.getenv("OUTBOX_BATCH_SIZE", "100")),
+                poll_interval=float(os.getenv("OUTBOX_POLL_INTERVAL", "0.5")),
+            ),
+            warmup=WarmupConfig(
+                on_startup=os.getenv("CACHE_WARM_ON_STARTUP", "false") == "true",
+                top=int(os.getenv("CACHE_WARM_TOP", "1000")),
+                batch_size=int(os.getenv("CACHE_WARM_BATCH_SIZE", "100")),
+                concurrency=int(os.getenv("CACHE_WARM_CONCURRENCY", "2")),
+                rate=float(os.getenv("CACHE_WARM_RATE", "5")),
+                list_pages=int(os.getenv("CACHE_WARM_LIST_PAGES", "5")),
+                list_page_size=int(os.getenv("CACHE_WARM_LIST_PAGE_SIZE", "20")),
+                hot_sample_rate=float(os.getenv("CACHE_HOT_SAMPLE_RATE", "0.05")),
+                hot_window_hours=int(os.getenv("CACHE_HOT_WINDOW_HOURS", "24")),
+            ),
         )
@@ -2,20 +2,68 @@ from typing import Iterable, cast
 from uuid import UUID
 
 import main.application.interfaces as interfaces
-from config import Config, SecretConfig
-from dishka import AnyOf, Provider, Scope, from_context, provide
-from main.infrastructure.db import new_session_maker
+from config import CachePolicy, Config, SecretConfig
+from dishka import Provider, Scope, from_context, provide
+from main.infrastructure.cache import (
+    CacheInvalidationBus,
+    SingleFlightCache,
+    TwoTierCache,
+)
+from main.infrastructure.db import UnitOfWork, new_session_maker
+from main.infrastructure.outbox import OutboxDrainer, SqlOutbox
 from main.infrastructure.redis import new_redis_client
+from main.infrastructure.response_cache import RedisResponseCache
 from main.infrastructure.sessions import (
     GuestSessionBackend,
     RedisSessionBackend,
+    SignedGuestCookie,
+)
+from products.application.interactors import (
+    CachedGetProductInteractor,
+    CachedListProductsInteractor,
+    GetProductInteractor,
+    GetProductsBatchInteractor,
+    GetProductVersionInteractor,
+    ListProductsInteractor,
+    ProductCacheStatsInteractor,
+    RestockProductInteractor,
+    SellProductInteractor,
+    UpdateProductInteractor,
+    WarmProductDetailsInteractor,
+)
+from products.application.interfaces import (
+    BrandCache,
+    CategoryCache,
+    HotProductsProtocol,
+    MissingProductsCacheProtocol,
+    ProductCache,
+    ProductCountCacheProtocol,
+    ProductCounterProtocol,
+    ProductDetailCacheProtocol,
+    ProductListCache,
+    ProductReaderProtocol,
+    TagCache,
 )
-from products.application.interactors import ListProductsInteractor
 from products.application.services import ProductService
+from products.application.types import LookupKind, lookup_tag
+from products.infrastructure.counters import (
+    CachedProductCounter,
+    DisabledProductCounter,
+    EstimatedProductCounter,
+    ExactProductCounter,
+    RedisProductCountCache,
+)
+from products.infrastructure.detail_cache import ProductDetailCache
+from products.infrastructure.hot_products import RedisHotProducts
+from products.infrastructure.invalidation import ProductCacheInvalidator
+from products.infrastructure.lookups import LookupCache
+from products.infrastructure.negative_cache import RedisMissingProductsCache
+from products.infrastructure.readers import ProductReader
 from products.infrastructure.repositories import (
     ProductRepository,
     ProductRepositoryProtocol,
 )
+from products.infrastructure.versions import track_lookup_renames
 from redis import Redis
 from sqlalchemy.orm import Session, sessionmaker
 from uuid_extensions import uuid7
@@ -30,39 +78,279 @@ class CatalogProvider(Provider):
 
     @provide(scope=Scope.APP)
     def get_session_maker(self, config: Config) -> sessionmaker[Session]:
-        return new_session_maker(config.postgres)
+        session_maker = new_session_maker(config.postgres)
+        track_lookup_renames(session_maker)
+        return session_maker
 
     @provide(scope=Scope.REQUEST)
     def get_session(
         self, session_maker: sessionmaker[Session],
-    ) -> Iterable[AnyOf[Session, interfaces.SessionProtocol]]:
+    ) -> Iterable[Session]:
         with session_maker() as session:
             yield session
 
+    @provide(scope=Scope.REQUEST)
+    def get_unit_of_work(
+        self, session: Session,
+    ) -> Iterable[interfaces.SessionProtocol]:
+        uow = UnitOfWork(session)
+        exc = yield uow
+        if exc is None:
+            uow.commit()
+        else:
+            uow.rollback()
+
     @provide(scope=Scope.APP)
     def get_redis_conn(self, config: Config) -> Redis:
         return new_redis_client(config.redis)
 
+    # --- Двухуровневые кэши (L1 в процессе + Redis) ---
+    @provide(scope=Scope.APP)
+    def get_invalidation_bus(self, redis: Redis) -> CacheInvalidationBus:
+        return CacheInvalidationBus(redis)
+
+    @provide(scope=Scope.APP)
+    def get_product_cache(
+        self, config: Config, redis: Redis, bus: CacheInvalidationBus,
+    ) -> ProductCache:
+        store = TwoTierCache(
+            "products:detail",
+            redis,
+            bus,
+            l1_size=config.cache.l1_size,
+            l1_ttl=config.cache.l1_ttl,
+            l2_ttl=config.cache.product_detail_ttl,
+        )
+        return store
+
+    @provide(scope=Scope.APP)
+    def get_brand_cache(
+        self, config: Config, redis: Redis, bus: CacheInvalidationBus,
+    ) -> BrandCache:
+        store = TwoTierCache(
+            "lookups:brand",
+            redis,
+            bus,
+            l1_size=config.cache.lookup_size,
+            l1_ttl=config.cache.l1_ttl,
+            l2_ttl=config.cache.lookup_ttl,
+        )
+        return store
+
+    @provide(scope=Scope.APP)
+    def get_category_cache(
+        self, config: Config, redis: Redis, bus: CacheInvalidationBus,
+    ) -> CategoryCache:
+        store = TwoTierCache(
+            "lookups:category",
+            redis,
+            bus,
+            l1_size=config.cache.lookup_size,
+            l1_ttl=config.cache.l1_ttl,
+            l2_ttl=config.cache.lookup_ttl,
+        )
+        return store
+
+    @provide(scope=Scope.APP)
+    def get_tag_cache(
+        self, config: Config, redis: Redis, bus: CacheInvalidationBus,
+    ) -> TagCache:
+        store = TwoTierCache(
+            "lookups:tag",
+            redis,
+            bus,
+            l1_size=config.cache.lookup_size,
+            l1_ttl=config.cache.l1_ttl,
+            l2_ttl=config.cache.lookup_ttl,
+        )
+        return store
+
+    @provide(scope=Scope.APP)
+    def get_product_list_cache(
+        self, config: Config, redis: Redis,
+    ) -> ProductListCache:
+        family = "products:list"
+        policy = config.cache.policies.get(family, CachePolicy())
+        return SingleFlightCache(family, redis, policy)
+
+    @provide(scope=Scope.APP)
+    def get_response_cache(
+        self, config: Config, redis: Redis,
+    ) -> interfaces.ResponseCacheProtocol:
+        return RedisResponseCache(redis, config.cache.response_ttl)
+
+    @provide(scope=Scope.APP)
+    def get_lookup_cache(
+        self,
+        session_maker: sessionmaker[Session],
+        brands: BrandCache,
+        categories: CategoryCache,
+        tags: TagCache,
+        responses: interfaces.ResponseCacheProtocol,
+        pages: ProductListCache,
+    ) -> LookupCache:
+        def purge_renamed(kind: LookupKind, names: set[str]) -> None:
+            tags = [lookup_tag(kind, name) for name in names]
+            # страницы хранят имена справочников: без этого сброшенные
+            # ответы собрались бы заново из страниц со старыми именами
+            pages.expire_all()
+            responses.purge(tags)
+
+        cache = LookupCache(
+            {"brand": brands, "category": categories, "tag": tags},
+            on_rename=purge_renamed,
+        )
+        cache.track_renames(session_maker)
+        return cache
+
     @provide(scope=Scope.APP)
     def get_uuid_generator(self) -> interfaces.UUIDGenerator:
         return lambda: cast(UUID, uuid7())
 
+    product_detail_cache = provide(
+        source=ProductDetailCache,
+        scope=Scope.APP,
+        provides=ProductDetailCacheProtocol,
+    )
+
+    @provide(scope=Scope.APP)
+    def get_hot_products(self, config: Config, redis: Redis) -> HotProductsProtocol:
+        return RedisHotProducts(
+            redis,
+            sample_rate=config.warmup.hot_sample_rate,
+            window_hours=config.warmup.hot_window_hours,
+        )
+
+    @provide(scope=Scope.APP)
+    def get_product_count_cache(
+        self, config: Config, redis: Redis,
+    ) -> ProductCountCacheProtocol:
+        return RedisProductCountCache(redis, config.catalog.count_cache_ttl)
+
+    @provide(scope=Scope.APP)
+    def get_missing_products_cache(
+        self, config: Config, redis: Redis,
+    ) -> MissingProductsCacheProtocol:
+        return RedisMissingProductsCache(redis, config.cache.missing_ttl)
+
+    # --- Outbox ---
+    outbox = provide(
+        source=SqlOutbox,
+        scope=Scope.REQUEST,
+        provides=interfaces.OutboxProtocol,
+    )
+
+    product_cache_invalidator = provide(
+        source=ProductCacheInvalidator,
+        scope=Scope.APP,
+    )
+
+    @provide(scope=Scope.APP)
+    def get_outbox_drainer(
+        self,
+        session_maker: sessionmaker[Session],
+        product_caches: ProductCacheInvalidator,
+    ) -> OutboxDrainer:
+        # новые подписчики (поисковый индекс, синхронизация) — сюда же
+        return OutboxDrainer(session_maker, handlers=[product_caches])
+
     product_repository = provide(
         source=ProductRepository,
         scope=Scope.REQUEST,
         provides=ProductRepositoryProtocol,
     )
 
+    product_reader = provide(
+        source=ProductReader,
+        scope=Scope.REQUEST,
+        provides=ProductReaderProtocol,
+    )
+
+    @provide(scope=Scope.REQUEST)
+    def get_product_counter(
+        self,
+        config: Config,
+        repo: ProductRepositoryProtocol,
+        counts: ProductCountCacheProtocol,
+        session: Session,
+        uow: interfaces.SessionProtocol,
+    ) -> ProductCounterProtocol:
+        # значение проверено в Config.load
+        mode = config.catalog.count_mode
+        if mode == "cached":
+            return CachedProductCounter(repo, counts, uow)
+        if mode == "estimate":
+            return EstimatedProductCounter(repo, session)
+        if mode == "off":
+            return DisabledProductCounter()
+        return ExactProductCounter(repo)
+
     product_service = provide(
         source=ProductService,
         scope=Scope.REQUEST,
     )
 
+    get_product_interactor = provide(
+        source=GetProductInteractor,
+        scope=Scope.REQUEST,
+    )
+
+    get_product_version_interactor = provide(
+        source=GetProductVersionInteractor,
+        scope=Scope.REQUEST,
+    )
+
+    warm_product_details_interactor = provide(
+        source=WarmProductDetailsInteractor,
+        scope=Scope.REQUEST,
+    )
+
+    cached_get_product_interactor = provide(
+        source=CachedGetProductInteractor,
+        scope=Scope.REQUEST,
+    )
+
+    product_cache_stats_interactor = provide(
+        source=ProductCacheStatsInteractor,
+        scope=Scope.REQUEST,
+    )
+
+    get_products_batch_interactor = provide(
+        source=GetProductsBatchInteractor,
+        scope=Scope.REQUEST,
+    )
+
     list_products_interactor = provide(
         source=ListProductsInteractor,
         scope=Scope.REQUEST,
     )
 
+    @provide(scope=Scope.REQUEST)
+    def get_cached_list_products_interactor(
+        self,
+        config: Config,
+        inner: ListProductsInteractor,
+        cache: ProductListCache,
+    ) -> CachedListProductsInteractor:
+        return CachedListProductsInteractor(
+            inner, cache, max_page=config.cache.list_cached_pages
+        )
+
+    update_product_interactor = provide(
+        source=UpdateProductInteractor,
+        scope=Scope.REQUEST,
+    )
+
+    restock_product_interactor = provide(
+        source=RestockProductInteractor,
+        scope=Scope.REQUEST,
+    )
+
+    sell_product_interactor = provide(
+        source=SellProductInteractor,
+        scope=Scope.REQUEST,
+    )
+
     redis_session_backend = provide(
         source=RedisSessionBackend,
         provides=interfaces.UserSessionBackendProtocol,
@@ -73,4 +361,10 @@ class CatalogProvider(Provider):
         source=GuestSessionBackend,
         provides=interfaces.GuestSessionBackendProtocol,
         scope=Scope.APP
-    )
\ No newline at end of file
+    )
+
+    guest_cookie = provide(
+        source=SignedGuestCookie,
+        provides=interfaces.GuestCookieProtocol,
+        scope=Scope.APP
+    )
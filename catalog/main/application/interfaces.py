@@ -1,7 +1,12 @@
-from typing import Any, Callable, Optional, Protocol, TypeVar
+from typing import Any, Callable, Iterable, Optional, Protocol, TypeVar
 from uuid import UUID
 
-from main.domain.entities import SessionData
+from main.domain.entities import (
+    CachedResponse,
+    GuestCookie,
+    OutboxEvent,
+    SessionData,
+)
 
 UUIDGenerator = Callable[[], UUID]
 
@@ -24,6 +29,107 @@ class SessionProtocol(Protocol):
         """Откатить транзакцию."""
         raise NotImplementedError()
 
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        """Выполнить callback после успешного коммита (при откате — отбросить)."""
+        raise NotImplementedError()
+
+
+class CacheProtocol(Protocol):
+    """Кэш байтовых значений по строковым ключам в пределах своего namespace."""
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError()
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, bytes]:
+        raise NotImplementedError()
+
+    def set(self, key: str, value: bytes) -> None:
+        raise NotImplementedError()
+
+    def set_many(self, items: dict[str, bytes]) -> None:
+        raise NotImplementedError()
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        """Удалить ключи на всех уровнях и во всех процессах."""
+        raise NotImplementedError()
+
+    def stats(self) -> dict[str, int]:
+        raise NotImplementedError()
+
+
+class SingleFlightCacheProtocol(Protocol):
+    """Кэш дорогих вычислений, где пересчёт ключа выполняет один воркер."""
+
+    def get_or_compute(self, key: str, compute: Callable[[], bytes]) -> bytes:
+        raise NotImplementedError()
+
+    def expire_all(self) -> None:
+        """Делает устаревшими все ключи семейства."""
+        raise NotImplementedError()
+
+
+class TaggedCacheProtocol(Protocol):
+    """Кэш байтовых значений, которые сбрасываются группами по тегам."""
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError()
+
+    def set(
+        self,
+        key: str,
+        value: bytes,
+        tags: Iterable[str],
+        ttl: Optional[int] = None,
+    ) -> None:
+        raise NotImplementedError()
+
+    def purge(self, tags: Iterable[str]) -> int:
+        """Удалить все значения с любым из тегов; вернуть число удалённых."""
+        raise NotImplementedError()
+
+
+class ResponseCacheProtocol(Protocol):
+    """Кэш готовых HTTP-ответов с суррогатными ключами (тегами) для сброса."""
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        raise NotImplementedError()
+
+    def set(
+        self,
+        key: str,
+        response: CachedResponse,
+        tags: Iterable[str],
+        ttl: Optional[int] = None,
+    ) -> None:
+        raise NotImplementedError()
+
+    def purge(self, tags: Iterable[str]) -> int:
+        """Удалить все ответы с любым из тегов; вернуть число удалённых."""
+        raise NotImplementedError()
+
+
+class OutboxProtocol(Protocol):
+    """Запись событий в outbox в той же транзакции, что и изменение данных."""
+
+    def publish(
+        self, topic: str, key: str, payload: Optional[dict[str, Any]] = None
+    ) -> None:
+        raise NotImplementedError()
+
+
+class OutboxHandlerProtocol(Protocol):
+    """
+    Получатель событий outbox по своим topics. Доставка at-least-once:
+    пачка может прийти повторно (сбой между обработкой и коммитом),
+    а порядок между пачками не гарантирован, поэтому обработка должна
+    быть идемпотентной и не зависеть от порядка.
+    """
+
+    topics: frozenset[str]
+
+    def handle(self, events: list[OutboxEvent]) -> None:
+        raise NotImplementedError()
+
 
 class SessionStorageProtocol(Protocol[SID, SData]):
     """Протокол для работы с сессиями в сторе (Redis, DB и т.д.)."""
@@ -35,15 +141,51 @@ class SessionStorageProtocol(Protocol[SID, SData]):
         raise NotImplementedError()
 
     def update(self, id: SID, data: SData) -> None:
+        """Записывает переданные ключи, не трогая остальные."""
         raise NotImplementedError()
 
     def delete(self, id: SID) -> None:
         raise NotImplementedError()
 
+    def read_fields(self, id: SID, keys: list[str]) -> dict[str, Any]:
+        """Только указанные ключи данных; отсутствующих в ответе нет."""
+        raise NotImplementedError()
+
+    def flush(self, id: SID, changed: dict[str, Any], removed: list[str]) -> bool:
+        """
+        Изменённые и удалённые ключи данных вместе с продлением TTL
+        за одно обращение к стору. False — сессии уже нет (отозвана
+        или истекла) и ничего не записано.
+        """
+        raise NotImplementedError()
+
 
 class UserSessionBackendProtocol(SessionStorageProtocol[UUID, SessionData]):
-    ...
+    def revoke_user(self, user_id: UUID) -> int:
+        """
+        Удаляет все сессии пользователя разом («выйти везде»);
+        возвращает число удалённых.
+        """
+        raise NotImplementedError()
 
 
 class GuestSessionBackendProtocol(SessionStorageProtocol[UUID, dict[str, Any]]):
-    ...
+    def merge_into(self, id: UUID, target: UUID) -> bool:
+        """
+        Атомарно переносит данные гостевой сессии в сессию target и
+        удаляет гостевую. False — гостевой сессии не было.
+        """
+        raise NotImplementedError()
+
+
+class GuestCookieProtocol(Protocol):
+    """Cookie гостя: имя и разбор подписанного состояния."""
+
+    name: str
+
+    def load(self, value: Optional[str]) -> Optional[GuestCookie]:
+        """None — cookie нет, она подделана или в старом формате."""
+        raise NotImplementedError()
+
+    def dump(self, cookie: GuestCookie) -> str:
+        raise NotImplementedError()
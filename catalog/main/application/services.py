@@ -1,10 +1,11 @@
-from dataclasses import asdict
 from typing import Any, Optional
 from uuid import UUID
 
+import msgspec
 from django.http import HttpRequest, HttpResponse
 
 from main.application.interfaces import (
+    GuestCookieProtocol,
     GuestSessionBackendProtocol,
     SessionData,
     UserSessionBackendProtocol,
@@ -16,17 +17,22 @@ class SessionService:
         self,
         guest_backend: GuestSessionBackendProtocol,
         auth_backend: UserSessionBackendProtocol,
+        guest_cookie: GuestCookieProtocol,
     ) -> None:
         self._guest_backend = guest_backend
         self._auth_backend = auth_backend
+        self._guest_cookie = guest_cookie
 
     def _get_auth_session_id(self, request: HttpRequest) -> Optional[UUID]:
         sid = request.COOKIES.get("auth_session")
         return UUID(sid) if sid else None
 
     def _get_guest_session_id(self, request: HttpRequest) -> Optional[UUID]:
-        sid = request.COOKIES.get("guest_session")
-        return UUID(sid) if sid else None
+        # гостевая cookie подписана; без ключа в Redis читать нечего
+        guest = self._guest_cookie.load(
+            request.COOKIES.get(self._guest_cookie.name)
+        )
+        return guest.sid if guest and guest.stored else None
 
     def _is_authenticated(self, request: HttpRequest) -> bool:
         return "auth_session" in request.COOKIES
@@ -38,7 +44,7 @@ class SessionService:
             return None
         if sid := self._get_auth_session_id(request):
             session = self._auth_backend.read(sid)
-            return asdict(session) if session else None
+            return msgspec.structs.asdict(session) if session else None
         return None
 
     def set_data(
@@ -62,7 +68,7 @@ class SessionService:
         else:
             if sid := self._get_guest_session_id(request):
                 self._guest_backend.delete(sid)
-            response.delete_cookie("guest_session")
+            response.delete_cookie(self._guest_cookie.name)
 
     def merge_guest_into_auth(
         self,
@@ -74,8 +80,6 @@ class SessionService:
         auth_sid = self._get_auth_session_id(request)
 
         if guest_sid and auth_sid:
-            if guest_data := self._guest_backend.read(guest_sid):
-                session = SessionData(**guest_data)
-                self._auth_backend.update(auth_sid, session)
-                self._guest_backend.delete(guest_sid)
-                response.delete_cookie("guest_session")
+            # перенос и удаление гостевой сессии — одна операция на сервере
+            if self._guest_backend.merge_into(guest_sid, auth_sid):
+                response.delete_cookie(self._guest_cookie.name)
@@ -1,9 +1,36 @@
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, NamedTuple
 from uuid import UUID
 
+import msgspec
 
-@dataclass
-class SessionData:
+
+class SessionData(msgspec.Struct):
     user_id: UUID
-    data: dict[str, Any]
\ No newline at end of file
+    data: dict[str, Any]
+
+
+class GuestCookie(NamedTuple):
+    """
+    Подписанное состояние гостя: id сессии и признак того, что под ним
+    уже есть ключ в Redis. Пока гость ничего не записал, ключа нет.
+    """
+
+    sid: UUID
+    stored: bool
+
+
+@dataclass
+class OutboxEvent:
+    id: int
+    topic: str
+    key: str
+    payload: dict[str, Any]
+    attempts: int
+
+
+@dataclass
+class CachedResponse:
+    status: int
+    headers: list[tuple[str, str]]
+    body: bytes
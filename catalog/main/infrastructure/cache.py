@@ -0,0 +1,446 @@
+import hashlib
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Generic,
+    Hashable,
+    Iterable,
+    Optional,
+    TypeVar,
+    cast,
+)
+from uuid import uuid4
+
+import msgspec
+from config import CachePolicy
+from redis import Redis
+from redis.client import Pipeline, PubSub
+
+from main.application.interfaces import (
+    CacheProtocol,
+    SingleFlightCacheProtocol,
+    TaggedCacheProtocol,
+)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Ограниченный по размеру процессный LRU-кэш, опционально с TTL записей.
+    Все операции под одной блокировкой, поэтому экземпляр можно делить
+    между потоками WSGI/ASGI-воркера.
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> Optional[V]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[K]) -> dict[K, V]:
+        now = time.monotonic()
+        with self._lock:
+            found: dict[K, V] = {}
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is None:
+                    continue
+                expires_at, value = entry
+                if expires_at <= now:
+                    del self._data[key]
+                    continue
+                self._data.move_to_end(key)
+                found[key] = value
+            return found
+
+    def put_many(self, items: dict[K, V]) -> None:
+        expires_at = float("inf") if self._ttl is None else time.monotonic() + self._ttl
+        with self._lock:
+            for key, value in items.items():
+                self._data[key] = (expires_at, value)
+                self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def put(self, key: K, value: V) -> None:
+        self.put_many({key: value})
+
+    def delete_many(self, keys: Iterable[K]) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# --- Двухуровневый кэш: L1 в процессе + L2 в Redis ---
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# MGET с учётом попаданий/промахов L2 за один round trip;
+# KEYS[1] — hash со счётчиками, остальные — запрашиваемые ключи
+_MGET_COUNTED = """
+local values = redis.call('MGET', unpack(KEYS, 2))
+local hits = 0
+for _, value in ipairs(values) do
+    if value then hits = hits + 1 end
+end
+if hits > 0 then redis.call('HINCRBY', KEYS[1], 'hits', hits) end
+if hits < #values then redis.call('HINCRBY', KEYS[1], 'misses', #values - hits) end
+return values
+"""
+
+_Invalidation = tuple[str, list[str]]
+
+
+class CacheInvalidationBus:
+    """
+    Рассылает инвалидации L1 по всем воркерам через Redis pub/sub.
+    Слушатель — daemon-поток, он поднимается при регистрации первого кэша
+    в процессе, то есть уже после форка воркера.
+    """
+
+    def __init__(self, redis: Redis, channel: str = INVALIDATION_CHANNEL) -> None:
+        self._redis = redis
+        self._channel = channel
+        self._caches: dict[str, "TwoTierCache"] = {}
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    def register(self, cache: "TwoTierCache") -> None:
+        with self._lock:
+            self._caches[cache.namespace] = cache
+            if self._worker is None:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{self._channel: self._on_message})
+                self._worker = pubsub.run_in_thread(
+                    sleep_time=1.0,
+                    daemon=True,
+                    exception_handler=self._on_error,
+                )
+
+    def publish(
+        self, namespace: str, keys: list[str], pipeline: Optional[Pipeline] = None
+    ) -> None:
+        message = msgspec.json.encode((namespace, keys))
+        (pipeline or self._redis).publish(self._channel, message)
+
+    def _on_message(self, message: dict[str, Any]) -> None:
+        namespace, keys = msgspec.json.decode(message["data"], type=_Invalidation)
+        if (cache := self._caches.get(namespace)) is not None:
+            cache.drop_local(keys)
+
+    def _on_error(
+        self, exc: BaseException, pubsub: PubSub, worker: threading.Thread
+    ) -> None:
+        # пока подписка разорвана, сообщения теряются: L1 сбрасывается целиком,
+        # а переподключение redis-py выполнит на следующем чтении
+        for cache in list(self._caches.values()):
+            cache.clear_local()
+        time.sleep(1.0)
+
+
+class TwoTierCache(CacheProtocol):
+    """
+    Байтовый кэш с ограниченным TTL'd LRU в процессе (L1) перед Redis (L2).
+    Инвалидация удаляет ключи из L2 и публикует их в шину, чтобы остальные
+    воркеры сбросили свой L1; TTL L1 ограничивает устаревание, если
+    сообщение потерялось.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        redis: Redis,
+        bus: CacheInvalidationBus,
+        l1_size: int,
+        l1_ttl: float,
+        l2_ttl: int,
+    ) -> None:
+        self.namespace = namespace
+        self._redis = redis
+        self._bus = bus
+        self._l2_ttl = l2_ttl
+        self._local: LRUCache[str, bytes] = LRUCache(l1_size, l1_ttl)
+        self._local_hits = 0
+        self._stats_key = f"cache:stats:{namespace}"
+        self._mget = redis.register_script(_MGET_COUNTED)
+        bus.register(self)
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, bytes]:
+        keys = list(keys)
+        found = self._local.get_many(keys)
+        # счётчик процесса приблизительный: без блокировки на горячем пути
+        self._local_hits += len(found)
+        missing = [k for k in keys if k not in found]
+        if not missing:
+            return found
+        values = self._mget(keys=[self._stats_key, *map(self._key, missing)])
+        fetched = {k: v for k, v in zip(missing, values) if v is not None}
+        self._local.put_many(fetched)
+        return found | fetched
+
+    def set(self, key: str, value: bytes) -> None:
+        self.set_many({key: value})
+
+    def set_many(self, items: dict[str, bytes]) -> None:
+        if not items:
+            return
+        pipe = self._redis.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.set(self._key(key), value, ex=self._l2_ttl)
+        pipe.execute()
+        self._local.put_many(items)
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if not keys:
+            return
+        self._local.delete_many(keys)
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.delete(*map(self._key, keys))
+        self._bus.publish(self.namespace, keys, pipeline=pipe)
+        pipe.execute()
+
+    def drop_local(self, keys: Iterable[str]) -> None:
+        self._local.delete_many(keys)
+
+    def clear_local(self) -> None:
+        self._local.clear()
+
+    def stats(self) -> dict[str, int]:
+        raw = cast(dict[bytes, bytes], self._redis.hgetall(self._stats_key))
+        stats = {"l1_hits": self._local_hits, "hits": 0, "misses": 0}
+        stats |= {k.decode(): int(v) for k, v in raw.items()}
+        return stats
+
+
+# --- Защита от stampede при пересчёте дорогих значений ---
+_RELEASE_LOCK = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class _Entry(msgspec.Struct, array_like=True):
+    value: bytes
+    delta: float  # сколько секунд занял пересчёт
+    expires_at: float  # unix time логического истечения
+    generation: int = 0  # поколение семейства, в котором значение посчитано
+
+
+class SingleFlightCache(SingleFlightCacheProtocol):
+    """
+    Кэш в Redis для дорогих значений, где истёкший ключ пересчитывает
+    один воркер, а не все разом. Стратегия задаётся CachePolicy семейства:
+
+    lock — пересчёт под коротким SET NX локом; пока он идёт, остальные
+    отдают устаревшее значение (ключ живёт ещё stale_ttl после ttl),
+    а при полном отсутствии значения недолго ждут результата.
+
+    xfetch — вероятностный досрочный пересчёт (Vattani et al.): чем ближе
+    истечение и чем дороже пересчёт, тем вероятнее, что очередной запрос
+    обновит значение заранее, поэтому одновременно его почти никогда
+    не пересчитывают несколько воркеров.
+
+    Ключи семейства перечислить нельзя, поэтому expire_all() сбрасывает
+    их разом: увеличивает счётчик поколения, и значения прошлых поколений
+    считаются истёкшими (для lock — отдаются как устаревшие, пока идёт
+    пересчёт). Счётчик читается тем же MGET, что и значение.
+    """
+
+    def __init__(self, namespace: str, redis: Redis, policy: CachePolicy) -> None:
+        self.namespace = namespace
+        self._redis = redis
+        self._policy = policy
+        self._release = redis.register_script(_RELEASE_LOCK)
+        self._generation_key = self._key("generation")
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get_or_compute(self, key: str, compute: Callable[[], bytes]) -> bytes:
+        if self._policy.strategy == "off":
+            return compute()
+        entry, generation = self._read(key)
+        if self._policy.strategy == "xfetch":
+            return self._xfetch(key, entry, generation, compute)
+        return self._locked(key, entry, generation, compute)
+
+    def expire_all(self) -> None:
+        self._redis.incr(self._generation_key)
+
+    def _read(self, key: str) -> tuple[Optional[_Entry], int]:
+        raw, generation = cast(
+            list[Optional[bytes]],
+            self._redis.mget([self._key(key), self._generation_key]),
+        )
+        current = int(generation or 0)
+        if raw is None:
+            return None, current
+        return msgspec.msgpack.decode(raw, type=_Entry), current
+
+    def _xfetch(
+        self,
+        key: str,
+        entry: Optional[_Entry],
+        generation: int,
+        compute: Callable[[], bytes],
+    ) -> bytes:
+        if entry is not None and entry.generation == generation:
+            # -ln(u) при u из (0, 1] — экспоненциальный сдвиг "текущего" времени
+            jitter = -entry.delta * self._policy.beta * math.log(1.0 - random.random())
+            if time.time() + jitter < entry.expires_at:
+                return entry.value
+        return self._recompute(key, generation, compute)
+
+    def _locked(
+        self,
+        key: str,
+        entry: Optional[_Entry],
+        generation: int,
+        compute: Callable[[], bytes],
+    ) -> bytes:
+        if (
+            entry is not None
+            and entry.generation == generation
+            and time.time() < entry.expires_at
+        ):
+            return entry.value
+        lock_key = self._key(f"lock:{key}")
+        token = uuid4().hex
+        lock_ms = int(self._policy.lock_ttl * 1000)
+        if self._redis.set(lock_key, token, nx=True, px=lock_ms):
+            try:
+                return self._recompute(key, generation, compute)
+            finally:
+                self._release(keys=[lock_key], args=[token])
+        if entry is not None:
+            return entry.value
+        # значения нет вовсе: ждём, пока его посчитает владелец лока
+        deadline = time.monotonic() + self._policy.lock_ttl
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            if (entry := self._read(key)[0]) is not None:
+                return entry.value
+        return self._recompute(key, generation, compute)
+
+    def _recompute(
+        self, key: str, generation: int, compute: Callable[[], bytes]
+    ) -> bytes:
+        # поколение берётся до пересчёта: если expire_all() случится
+        # во время compute(), результат сразу окажется устаревшим
+        started = time.monotonic()
+        value = compute()
+        delta = time.monotonic() - started
+        policy = self._policy
+        entry = _Entry(value, delta, time.time() + policy.ttl, generation)
+        keep = policy.ttl + (policy.stale_ttl if policy.strategy == "lock" else 0)
+        self._redis.set(self._key(key), msgspec.msgpack.encode(entry), ex=keep)
+        return value
+
+
+# --- Кэш с тегами для группового сброса ---
+# KEYS[1] — значение, KEYS[2..] — множества тегов; ARGV: payload, ttl,
+# размер выборки. Множество тега живёт не меньше самого долгого значения
+# в нём, поэтому у популярного тега (list:products) оно не истекает
+# никогда. Чтобы оно не копило ключи истёкших значений, каждая запись
+# проверяет несколько случайных членов и убирает мёртвые: при выборке
+# из 3 множество держится в пределах ~1.5 числа живых значений с тегом.
+_TAGGED_STORE = """
+local ttl = tonumber(ARGV[2])
+local sample = tonumber(ARGV[3])
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ttl)
+for i = 2, #KEYS do
+    for _, member in ipairs(redis.call('SRANDMEMBER', KEYS[i], sample)) do
+        if redis.call('EXISTS', member) == 0 then
+            redis.call('SREM', KEYS[i], member)
+        end
+    end
+    redis.call('SADD', KEYS[i], KEYS[1])
+    if redis.call('TTL', KEYS[i]) < ttl then
+        redis.call('EXPIRE', KEYS[i], ttl)
+    end
+end
+"""
+
+# сколько членов множества тега проверяется при каждой записи
+_TAG_PRUNE_SAMPLE = 3
+
+# KEYS — множества тегов; удаляет все значения из них и сами множества
+_TAGGED_PURGE = """
+local deleted = 0
+for _, tag in ipairs(KEYS) do
+    local members = redis.call('SMEMBERS', tag)
+    for i = 1, #members, 500 do
+        local last = math.min(i + 499, #members)
+        deleted = deleted + redis.call('DEL', unpack(members, i, last))
+    end
+    redis.call('DEL', tag)
+end
+return deleted
+"""
+
+
+class RedisTaggedCache(TaggedCacheProtocol):
+    """
+    Значения в Redis под ключами {namespace}:{hash}; каждое регистрируется
+    в множествах {namespace}:tag:{tag}, так что purge сбрасывает все
+    значения с тегом одним вызовом Lua, без перебора ключей.
+    """
+
+    def __init__(self, namespace: str, redis: Redis, default_ttl: int) -> None:
+        self.namespace = namespace
+        self._redis = redis
+        self._default_ttl = default_ttl
+        self._store = redis.register_script(_TAGGED_STORE)
+        self._purge = redis.register_script(_TAGGED_PURGE)
+
+    def _entry_key(self, key: str) -> str:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        return f"{self.namespace}:{digest}"
+
+    def _tag_keys(self, tags: Iterable[str]) -> list[str]:
+        return [f"{self.namespace}:tag:{tag}" for tag in dict.fromkeys(tags)]
+
+    def get(self, key: str) -> Optional[bytes]:
+        return cast(Optional[bytes], self._redis.get(self._entry_key(key)))
+
+    def set(
+        self,
+        key: str,
+        value: bytes,
+        tags: Iterable[str],
+        ttl: Optional[int] = None,
+    ) -> None:
+        self._store(
+            keys=[self._entry_key(key), *self._tag_keys(tags)],
+            args=[value, ttl or self._default_ttl, _TAG_PRUNE_SAMPLE],
+        )
+
+    def purge(self, tags: Iterable[str]) -> int:
+        if not (tag_keys := self._tag_keys(tags)):
+            return 0
+        return cast(int, self._purge(keys=tag_keys))
@@ -0,0 +1,82 @@
+import datetime
+from functools import wraps
+from typing import Callable, Optional
+
+from config import Config
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from ..integrations import DishkaRequest
+
+# ответы, которым можно выставлять публичный Cache-Control
+_CACHEABLE_STATUSES = {200, 304}
+
+
+# --- Условный GET ---
+def not_modified(
+    request: HttpRequest, etag: str, last_modified: datetime.datetime
+) -> Optional[HttpResponse]:
+    """
+    304 с валидаторами, если у клиента актуальная версия, иначе None.
+    If-None-Match проверяется раньше If-Modified-Since (RFC 9110).
+    """
+    response = get_conditional_response(
+        request, etag=quote_etag(etag), last_modified=int(last_modified.timestamp())
+    )
+    if response is None:
+        return None
+    return with_validators(response, etag, last_modified)
+
+
+def with_validators(
+    response: HttpResponse, etag: str, last_modified: datetime.datetime
+) -> HttpResponse:
+    response.headers["ETag"] = quote_etag(etag)
+    response.headers["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
+
+
+def revalidate(request: HttpRequest, response: HttpResponse) -> HttpResponse:
+    """
+    Проверка условных заголовков против уже готового ответа (например,
+    из кэша ответов) по его ETag/Last-Modified — без обращения к БД.
+    """
+    etag = response.headers.get("ETag")
+    last_modified = parse_http_date_safe(response.headers.get("Last-Modified", ""))
+    if etag is None and last_modified is None:
+        return response
+    # с переданным response Django возвращает ответ всегда; None — только
+    # по аннотации
+    return (
+        get_conditional_response(
+            request, etag=etag, last_modified=last_modified, response=response
+        )
+        or response
+    )
+
+
+# --- Cache-Control ---
+def public_cache_control(
+    view: Callable[..., HttpResponse],
+) -> Callable[..., HttpResponse]:
+    """
+    Публичный Cache-Control для 200/304 с max-age и stale-while-revalidate
+    из CacheConfig: CDN отдаёт повторные запросы сам, а после max-age
+    продолжает отдавать устаревший ответ, пока перепроверяет его в фоне.
+    """
+
+    @wraps(view)
+    def wrapper(request: DishkaRequest, *args, **kwargs) -> HttpResponse:
+        response = view(request, *args, **kwargs)
+        if response.status_code in _CACHEABLE_STATUSES:
+            cache = request.container.get(Config).cache
+            patch_cache_control(
+                response,
+                public=True,
+                max_age=cache.http_max_age,
+                stale_while_revalidate=cache.http_stale_while_revalidate,
+            )
+        return response
+
+    return wrapper
@@ -1,12 +1,43 @@
+from typing import Callable
+
 from config import PostgresConfig
 from sqlalchemy import create_engine
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
+from main.application.interfaces import SessionProtocol
+
 
 class Base(DeclarativeBase):
     pass
 
 
+class UnitOfWork(SessionProtocol):
+    """
+    Единица работы на запрос: репозитории только делают flush,
+    а коммит выполняется один раз при закрытии REQUEST-скоупа.
+    """
+
+    def __init__(self, session: Session) -> None:
+        self._session = session
+        self._on_commit: list[Callable[[], None]] = []
+
+    def commit(self) -> None:
+        self._session.commit()
+        callbacks, self._on_commit = self._on_commit, []
+        for callback in callbacks:
+            callback()
+
+    def flush(self) -> None:
+        self._session.flush()
+
+    def rollback(self) -> None:
+        self._session.rollback()
+        self._on_commit.clear()
+
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        self._on_commit.append(callback)
+
+
 def new_session_maker(psql_config: PostgresConfig) -> sessionmaker[Session]:
     raw_url = "postgresql+psycopg2://{login}:{password}@{host}:{port}/{database}"
     database_uri = raw_url.format(
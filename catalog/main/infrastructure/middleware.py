@@ -5,15 +5,21 @@ from uuid import UUID
 from django.contrib.sessions.backends.base import SessionBase
 from django.http import HttpResponse
 
-from catalog.main.infrastructure.sessions import CustomSession
 from main.application.interfaces import (
     GuestSessionBackendProtocol,
     UserSessionBackendProtocol,
     UUIDGenerator,
 )
-from main.domain.entities import SessionData
 
 from ..integrations import DishkaRequest
+from .sessions import (
+    AUTH_COOKIE,
+    GUEST_COOKIE,
+    CustomSession,
+    GuestCookie,
+    dump_guest_cookie,
+    load_guest_cookie,
+)
 
 
 class MiddlewareMeta(type):
@@ -21,7 +27,7 @@ class MiddlewareMeta(type):
         instance = super().__call__(get_response)
         from container import container
         instance.redis_backend = container.get(UserSessionBackendProtocol)
-        instance.guest_manager = container.get(GuestSessionBackendProtocol)
+        instance.guest_backend = container.get(GuestSessionBackendProtocol)
         instance.uuid_generator = container.get(UUIDGenerator)
         return instance
 
@@ -29,62 +35,69 @@ class MiddlewareMeta(type):
 class SessionMiddleware(metaclass=MiddlewareMeta):
     """
     Кастомный middleware для управления аутентифицированными и гостевыми сессиями.
+    Гость без записанных данных живёт только в подписанной cookie: ключ
+    в Redis появляется при первой записи в сессию, поэтому анонимный
+    трафик и боты не оставляют в Redis ничего.
     """
 
     redis_backend: UserSessionBackendProtocol
-    guest_manager: GuestSessionBackendProtocol
+    guest_backend: GuestSessionBackendProtocol
     uuid_generator: UUIDGenerator
 
     def __init__(self, get_response) -> None:
         self.get_response = get_response
 
     def __call__(self, request: DishkaRequest) -> HttpResponse:
-        sid, data = self._load_or_init_session(request)
+        guest = load_guest_cookie(request.COOKIES.get(GUEST_COOKIE))
+        session = self._init_session(request, guest)
         response: HttpResponse = self.get_response(request)
-        self._sync_guest_session(request, response, sid, data)
+        # вьюха сессию не трогала — ни чтения, ни записи в Redis; иначе
+        # не больше двух обращений: чтение по требованию вьюхи и save()
+        if session.accessed:
+            session.save()
+            if session.revoked:
+                # «выйти везде» или истечение: запись не воскрешает сессию
+                response.delete_cookie(AUTH_COOKIE)
+                return response
+            self._sync_guest_cookie(request, response, session, guest)
         return response
 
-    def _load_or_init_session(
-        self,
-        request: DishkaRequest
-    ) -> tuple[UUID, SessionData]:
-        sid: UUID = self.uuid_generator()
-        data: SessionData | None = None
-
-        if sid_hex := request.COOKIES.get("auth_session") or request.COOKIES.get(
-            "guest_session"
-        ):
+    def _init_session(
+        self, request: DishkaRequest, guest: GuestCookie | None
+    ) -> CustomSession:
+        """Только разбор cookie; данные сессия прочитает сама по требованию."""
+        sid: UUID | None = None
+        stored = False
+        backend: UserSessionBackendProtocol | GuestSessionBackendProtocol
+        if auth_hex := request.COOKIES.get(AUTH_COOKIE):
+            backend = self.redis_backend
             with contextlib.suppress(ValueError):
-                sid = UUID(sid_hex)
-                data = self.redis_backend.read(sid)
-
-        if not data:
-            data = SessionData(user_id=sid, data={})
-            self.redis_backend.create(sid, data)
-
-        request.session = cast(
-            SessionBase, 
-            CustomSession(sid, data, self.redis_backend)
-        )
-        return sid, data
-
-    def _sync_guest_session(
+                sid, stored = UUID(auth_hex), True
+        else:
+            # гостевые данные живут под гостевым TTL и без индекса
+            backend = self.guest_backend
+            if guest is not None:
+                sid, stored = guest
+
+        session = CustomSession(sid, stored, backend, self.uuid_generator)
+        request.session = cast(SessionBase, session)
+        return session
+
+    def _sync_guest_cookie(
         self,
         request: DishkaRequest,
         response: HttpResponse,
-        sid: UUID | None,
-        data: SessionData | None
+        session: CustomSession,
+        guest: GuestCookie | None,
     ) -> None:
-        if "session_data" not in request.session:
-            guest_id = self.uuid_generator()
-            with contextlib.suppress(ValueError, TypeError):
-                guest_id = sid or guest_id
-
-            self.guest_manager.create(guest_id, {})
-            request.session["session_data"] = str(guest_id)
-            response.set_cookie("guest_session", guest_id.hex, httponly=True)
-
-        elif data and "auth_session" in request.COOKIES:
-            if sid:
-                self.guest_manager.delete(sid)
-            response.delete_cookie("guest_session")
+        if AUTH_COOKIE in request.COOKIES:
+            # после входа гостевая сессия больше не нужна
+            if guest is not None:
+                if guest.stored:
+                    self.guest_backend.delete(guest.sid)
+                response.delete_cookie(GUEST_COOKIE)
+            return
+
+        state = GuestCookie(cast(UUID, session.session_id), session.stored)
+        if state != guest:
+            response.set_cookie(GUEST_COOKIE, dump_guest_cookie(state), httponly=True)
@@ -0,0 +1,162 @@
+import datetime
+import logging
+from collections import defaultdict
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Integer,
+    String,
+    delete,
+    func,
+    literal_column,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, Session, mapped_column, sessionmaker
+
+from main.application.interfaces import (
+    OutboxHandlerProtocol,
+    OutboxProtocol,
+    SessionProtocol,
+)
+from main.domain.entities import OutboxEvent
+
+from .db import Base
+
+logger = logging.getLogger(__name__)
+
+# потолок паузы перед повтором упавшего события, секунды
+MAX_RETRY_DELAY = 300
+
+
+class OutboxModel(Base):
+    __tablename__ = "outbox"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    topic: Mapped[str] = mapped_column(String, nullable=False)
+    key: Mapped[str] = mapped_column(String, nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    # событие не берётся в работу раньше этого момента (повторы с паузой)
+    available_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+class SqlOutbox(OutboxProtocol):
+    """
+    Событие пишется строкой в outbox в транзакции текущей единицы работы:
+    оно появляется ровно тогда, когда закоммичено само изменение,
+    и не теряется, если брокер или Redis в этот момент недоступны.
+    После коммита те же события сразу раздаются обработчикам — без
+    гарантий, чтобы кэши не ждали drain_outbox; гарантированную доставку
+    по-прежнему даёт только он, обработчики идемпотентны.
+    """
+
+    def __init__(
+        self, session: Session, uow: SessionProtocol, drainer: "OutboxDrainer"
+    ) -> None:
+        self.session = session
+        self._uow = uow
+        self._drainer = drainer
+        self._pending: list[OutboxEvent] = []
+
+    def publish(
+        self, topic: str, key: str, payload: Optional[dict[str, Any]] = None
+    ) -> None:
+        payload = payload or {}
+        self.session.add(OutboxModel(topic=topic, key=key, payload=payload))
+        if not self._pending:
+            self._uow.on_commit(self._dispatch)
+        # id строки до коммита неизвестен, обработчикам он не нужен
+        self._pending.append(OutboxEvent(0, topic, key, payload, 0))
+
+    def _dispatch(self) -> None:
+        events, self._pending = self._pending, []
+        self._drainer.dispatch(events)
+
+
+class OutboxDrainer:
+    """
+    Разбор outbox пачками. Строки берутся FOR UPDATE SKIP LOCKED, так что
+    несколько воркеров делят очередь без ожидания друг друга. Пачка
+    раздаётся обработчикам по topic; успешные строки удаляются, а строки
+    упавшего обработчика остаются с паузой 2^attempts секунд — в той же
+    транзакции, поэтому падение воркера просто вернёт их в очередь.
+    События без подписчиков удаляются сразу.
+    """
+
+    def __init__(
+        self,
+        session_maker: sessionmaker[Session],
+        handlers: Iterable[OutboxHandlerProtocol],
+    ) -> None:
+        self._session_maker = session_maker
+        self._routes: dict[str, list[OutboxHandlerProtocol]] = defaultdict(list)
+        for handler in handlers:
+            for topic in handler.topics:
+                self._routes[topic].append(handler)
+
+    def drain(self, batch_size: int) -> int:
+        """Обрабатывает одну пачку; возвращает число взятых строк."""
+        with self._session_maker() as session, session.begin():
+            rows = session.execute(
+                select(
+                    OutboxModel.id,
+                    OutboxModel.topic,
+                    OutboxModel.key,
+                    OutboxModel.payload,
+                    OutboxModel.attempts,
+                )
+                .where(OutboxModel.available_at <= func.now())
+                .order_by(OutboxModel.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not rows:
+                return 0
+            events = [OutboxEvent(*row) for row in rows]
+            failed = self.dispatch(events)
+            if done := [e.id for e in events if e.id not in failed]:
+                session.execute(delete(OutboxModel).where(OutboxModel.id.in_(done)))
+            if failed:
+                delay = func.least(func.power(2, OutboxModel.attempts), MAX_RETRY_DELAY)
+                session.execute(
+                    update(OutboxModel)
+                    .where(OutboxModel.id.in_(failed))
+                    .values(
+                        attempts=OutboxModel.attempts + 1,
+                        available_at=func.now()
+                        + delay * literal_column("interval '1 second'"),
+                    )
+                )
+        return len(events)
+
+    def dispatch(self, events: list[OutboxEvent]) -> set[int]:
+        """Раздаёт события обработчикам; возвращает id тех, что надо повторить."""
+        by_topic: dict[str, list[OutboxEvent]] = defaultdict(list)
+        for event in events:
+            by_topic[event.topic].append(event)
+
+        failed: set[int] = set()
+        for topic, batch in by_topic.items():
+            for handler in self._routes.get(topic, ()):
+                try:
+                    handler.handle(batch)
+                except Exception:
+                    logger.exception(
+                        "outbox handler %s failed on %d %s events",
+                        type(handler).__name__,
+                        len(batch),
+                        topic,
+                    )
+                    failed.update(event.id for event in batch)
+        return failed
@@ -0,0 +1,101 @@
+from functools import wraps
+from typing import Callable, Iterable, Optional
+
+import msgspec
+from django.http import HttpRequest, HttpResponse
+from redis import Redis
+
+from main.application.interfaces import ResponseCacheProtocol
+from main.domain.entities import CachedResponse
+
+from ..integrations import DishkaRequest
+from .cache import RedisTaggedCache
+from .conditional import revalidate
+
+RESPONSE_NAMESPACE = "resp"
+
+# заголовки, которые не должны попадать в общий для всех клиентов ответ
+_PRIVATE_HEADERS = {"set-cookie", "vary"}
+
+
+class RedisResponseCache(ResponseCacheProtocol):
+    """
+    Ответы целиком (статус, заголовки, тело) в Redis. Каждый ответ
+    регистрируется в множествах своих тегов (product:<id>, list:products…),
+    так что запись сбрасывает все затронутые страницы одним вызовом purge.
+    """
+
+    def __init__(self, redis: Redis, default_ttl: int) -> None:
+        self._store = RedisTaggedCache(RESPONSE_NAMESPACE, redis, default_ttl)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        raw = self._store.get(key)
+        if raw is None:
+            return None
+        return msgspec.msgpack.decode(raw, type=CachedResponse)
+
+    def set(
+        self,
+        key: str,
+        response: CachedResponse,
+        tags: Iterable[str],
+        ttl: Optional[int] = None,
+    ) -> None:
+        self._store.set(key, msgspec.msgpack.encode(response), tags, ttl)
+
+    def purge(self, tags: Iterable[str]) -> int:
+        return self._store.purge(tags)
+
+
+# --- Декоратор для view ---
+def _query_variant(request: HttpRequest) -> Optional[str]:
+    return "&".join(f"{k}={v}" for k, v in sorted(request.GET.items()))
+
+
+def cache_response(
+    tags: Callable[[HttpRequest, bytes], Iterable[str]],
+    variant: Callable[[HttpRequest], Optional[str]] = _query_variant,
+    ttl: Optional[int] = None,
+) -> Callable[[Callable[..., HttpResponse]], Callable[..., HttpResponse]]:
+    """
+    Opt-in кэш ответа GET-view. Ключ — путь плюс variant(request):
+    нормализованные параметры, None — не кэшировать (например, невалидный
+    запрос). Сессия и куки в ключ не входят, поэтому гости и авторизованные
+    пользователи с одинаковой выдачей делят одну запись. Кэшируются только
+    ответы 200; tags(request, body) задаёт суррогатные ключи для сброса.
+    Попадание сверяется с If-None-Match/If-Modified-Since по сохранённым
+    ETag/Last-Modified и может стать 304 без обращения к view.
+    """
+
+    def decorator(view: Callable[..., HttpResponse]) -> Callable[..., HttpResponse]:
+        @wraps(view)
+        def wrapper(request: DishkaRequest, *args, **kwargs) -> HttpResponse:
+            if request.method != "GET" or (suffix := variant(request)) is None:
+                return view(request, *args, **kwargs)
+            cache = request.container.get(ResponseCacheProtocol)
+            key = f"{request.path}?{suffix}"
+            if (cached := cache.get(key)) is not None:
+                response = HttpResponse(cached.body, status=cached.status)
+                for name, value in cached.headers:
+                    response[name] = value
+                return revalidate(request, response)
+
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                headers = [
+                    (name, value)
+                    for name, value in response.items()
+                    if name.lower() not in _PRIVATE_HEADERS
+                ]
+                body = response.content
+                cache.set(
+                    key,
+                    CachedResponse(response.status_code, headers, body),
+                    tags(request, body),
+                    ttl,
+                )
+            return response
+
+        return wrapper
+
+    return decorator
@@ -1,108 +1,535 @@
-import json
-from dataclasses import asdict
-from typing import Any, Optional, cast
+from typing import Any, Iterable, Mapping, Optional, cast
 from uuid import UUID
 
+import msgspec
 from django.contrib.sessions.backends.base import SessionBase
+from django.core import signing
 from redis import Redis
+from redis.typing import EncodableT
 
 from main.application.interfaces import (
+    GuestCookieProtocol,
     GuestSessionBackendProtocol,
-    SessionStorageProtocol,
     UserSessionBackendProtocol,
+    UUIDGenerator,
 )
-from main.domain.entities import SessionData
+from main.domain.entities import GuestCookie, SessionData
 
+AUTH_COOKIE = "auth_session"
+GUEST_COOKIE = "guest_session"
+_GUEST_COOKIE_SALT = "main.sessions.guest"
 
-class RedisSessionBackend(UserSessionBackendProtocol):
-    """Управление авторизованными сессиями в Redis."""
+
+# --- Гостевая cookie ---
+def dump_guest_cookie(cookie: GuestCookie) -> str:
+    return signing.dumps([cookie.sid.hex, cookie.stored], salt=_GUEST_COOKIE_SALT)
+
+
+def load_guest_cookie(value: Optional[str]) -> Optional[GuestCookie]:
+    """None — cookie нет, она подделана или в старом формате."""
+    if not value:
+        return None
+    try:
+        sid_hex, stored = signing.loads(value, salt=_GUEST_COOKIE_SALT)
+        return GuestCookie(UUID(sid_hex), bool(stored))
+    except (signing.BadSignature, ValueError, TypeError):
+        return None
+
+
+class SignedGuestCookie(GuestCookieProtocol):
+    name = GUEST_COOKIE
+
+    def load(self, value: Optional[str]) -> Optional[GuestCookie]:
+        return load_guest_cookie(value)
+
+    def dump(self, cookie: GuestCookie) -> str:
+        return dump_guest_cookie(cookie)
+
+
+# --- Формат сессии в Redis ---
+# Сессия — хэш session:{id}: поле версии, id пользователя (16 байт)
+# и по полю d:{ключ} на каждый ключ данных со значением в msgpack.
+# Поля пишутся по отдельности, так что параллельные запросы, меняющие
+# разные ключи, не затирают друг друга.
+# Скрипты ниже собирают часть ключей сами (члены индекса, индекс по uid
+# из хэша) и трогают ключи разных сессий в одном вызове, поэтому схема
+# рассчитана на Redis без кластера: в Redis Cluster ключи попадут в разные
+# слоты, и вызовы упадут с CROSSSLOT.
+_KEY_PREFIX = "session:"
+# индекс пользователя: множество hex id его живых сессий
+_USER_INDEX_PREFIX = "session:user:"
+_VERSION_FIELD = "v"
+_USER_FIELD = "uid"
+_DATA_PREFIX = "d:"
+_HASH_VERSION = b"1"
+
+_value_encoder = msgspec.msgpack.Encoder()
+_value_decoder = msgspec.msgpack.Decoder()
+
+# Прежний формат — строка под голым id.hex: байт версии 0x01 и msgpack
+# SessionData либо JSON. Читается, пока такие ключи не истекут.
+_BLOB_V1 = b"\x01"
+_blob_decoder = msgspec.msgpack.Decoder(SessionData)
+_legacy_blob_decoder = msgspec.json.Decoder(SessionData)
+
+# Общие функции скриптов. Индекс пользователя должен жить не меньше
+# его сессий, иначе «выйти везде» не найдёт продлённую сессию: всё,
+# что продлевает сессию с id пользователя, продлевает и индекс.
+# Ключ индекса собирается из поля uid — 16 байт id пользователя в hex.
+_INDEX_FUNCTIONS = """
+local function index_key(session, prefix)
+    local uid = redis.call('HGET', session, 'uid')
+    if not uid then
+        return nil
+    end
+    return prefix .. string.gsub(uid, '.', function(c)
+        return string.format('%02x', string.byte(c))
+    end)
+end
+local function touch_index(session, prefix, ttl)
+    local index = index_key(session, prefix)
+    if index and redis.call('TTL', index) < tonumber(ttl) then
+        redis.call('EXPIRE', index, ttl)
+    end
+end
+"""
+
+# Перенос гостевых полей данных в другую сессию и удаление гостевой
+# одним вызовом: между чтением и записью никто не вклинится.
+# KEYS[1] — гостевая сессия, KEYS[2] — целевая; ARGV[1] — TTL целевой,
+# ARGV[2] — версия формата, ARGV[3] — префикс индексов. Возвращает число
+# перенесённых ключей или -1, если гостевой сессии нет.
+_MERGE = _INDEX_FUNCTIONS + """
+local fields = redis.call('HGETALL', KEYS[1])
+if #fields == 0 then
+    return -1
+end
+local moved = 0
+for i = 1, #fields, 2 do
+    if string.sub(fields[i], 1, 2) == 'd:' then
+        redis.call('HSET', KEYS[2], fields[i], fields[i + 1])
+        moved = moved + 1
+    end
+end
+redis.call('HSET', KEYS[2], 'v', ARGV[2])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+touch_index(KEYS[2], ARGV[3], ARGV[1])
+redis.call('DEL', KEYS[1])
+return moved
+"""
+
+
+# HGETALL с продлением TTL в том же вызове, но только когда осталось
+# меньше половины: большинство чтений сессии не пишут в Redis ничего.
+# KEYS[1] — сессия; ARGV[1] — полный TTL, ARGV[2] — префикс индексов.
+_READ = _INDEX_FUNCTIONS + """
+local fields = redis.call('HGETALL', KEYS[1])
+if #fields > 0 then
+    local ttl = tonumber(ARGV[1])
+    local left = redis.call('TTL', KEYS[1])
+    if left >= 0 and left < ttl / 2 then
+        redis.call('EXPIRE', KEYS[1], ttl)
+        touch_index(KEYS[1], ARGV[2], ttl)
+    end
+end
+return fields
+"""
+
+
+# Запись изменённых и удаление убранных полей сессии пользователя вместе
+# с продлением TTL. Пока сессия лежит в прежнем формате, хэша ещё нет,
+# и запись отдельных полей спрятала бы остальные данные: тогда ничего
+# не пишется и возвращается 0, а сессию целиком переносит вызывающий.
+# Если нет ни хэша, ни ключа прежнего формата, сессия отозвана или
+# истекла: хэш не создаётся заново (иначе запись после «выйти везде»
+# воскресила бы сессию) и возвращается -1.
+# KEYS[1] — сессия, KEYS[2] — ключ прежнего формата; ARGV[1] — TTL,
+# ARGV[2] — версия формата, ARGV[3] — префикс индексов, ARGV[4] — число
+# изменённых полей n, дальше n пар «поле, значение» и удалённые поля.
+_FLUSH = _INDEX_FUNCTIONS + """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return redis.call('EXISTS', KEYS[2]) - 1
+end
+local n = tonumber(ARGV[4])
+redis.call('HSET', KEYS[1], 'v', ARGV[2])
+for i = 5, 4 + 2 * n, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+for i = 5 + 2 * n, #ARGV do
+    redis.call('HDEL', KEYS[1], ARGV[i])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+touch_index(KEYS[1], ARGV[3], ARGV[1])
+return 1
+"""
+
+
+# Регистрация сессии в индексе пользователя с ленивой чисткой: id
+# истёкших сессий удаляются при каждом добавлении, так что размер
+# множества ограничен числом сессий, заведённых с прошлой чистки.
+# TTL индекса не меньше TTL сессии, так что брошенный индекс истекает.
+# KEYS[1] — индекс; ARGV[1] — id сессии, ARGV[2] — префикс ключей сессий,
+# ARGV[3] — TTL сессии.
+_INDEX = """
+local pruned = 0
+for _, sid in ipairs(redis.call('SMEMBERS', KEYS[1])) do
+    if redis.call('EXISTS', ARGV[2] .. sid) == 0 then
+        redis.call('SREM', KEYS[1], sid)
+        pruned = pruned + 1
+    end
+end
+redis.call('SADD', KEYS[1], ARGV[1])
+if redis.call('TTL', KEYS[1]) < tonumber(ARGV[3]) then
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+return pruned
+"""
+
+# Удаление сессии вместе с её записью в индексе пользователя.
+# KEYS[1] — сессия, KEYS[2] — ключ прежнего формата;
+# ARGV[1] — префикс индексов, ARGV[2] — id сессии.
+_DELETE = _INDEX_FUNCTIONS + """
+local index = index_key(KEYS[1], ARGV[1])
+local deleted = redis.call('DEL', KEYS[1], KEYS[2])
+if index then
+    redis.call('SREM', index, ARGV[2])
+end
+return deleted
+"""
+
+# Все сессии пользователя по индексу и сам индекс — одним вызовом.
+# KEYS[1] — индекс; ARGV[1] — префикс ключей сессий.
+_REVOKE = """
+local deleted = 0
+for _, sid in ipairs(redis.call('SMEMBERS', KEYS[1])) do
+    deleted = deleted + redis.call('DEL', ARGV[1] .. sid)
+end
+redis.call('DEL', KEYS[1])
+return deleted
+"""
+
+
+def encode_fields(data: dict[str, Any]) -> dict[str, bytes]:
+    return {_DATA_PREFIX + key: _value_encoder.encode(v) for key, v in data.items()}
+
+
+def decode_fields(raw: dict[bytes, bytes]) -> Optional[dict[str, Any]]:
+    """Ключи данных из HGETALL; None — хэш неизвестной версии."""
+    if raw.get(_VERSION_FIELD.encode()) != _HASH_VERSION:
+        return None
+    prefix = _DATA_PREFIX.encode()
+    return {
+        field[len(prefix):].decode(): _value_decoder.decode(value)
+        for field, value in raw.items()
+        if field.startswith(prefix)
+    }
+
+
+def encode_session(data: SessionData) -> dict[str, bytes]:
+    return {
+        _VERSION_FIELD: _HASH_VERSION,
+        _USER_FIELD: data.user_id.bytes,
+        **encode_fields(data.data),
+    }
+
+
+def decode_session(id: UUID, raw: dict[bytes, bytes]) -> Optional[SessionData]:
+    """Сессия из HGETALL; без id пользователя им считается id сессии."""
+    if (data := decode_fields(raw)) is None:
+        return None
+    user_id = raw.get(_USER_FIELD.encode())
+    return SessionData(user_id=UUID(bytes=user_id) if user_id else id, data=data)
+
+
+def _decode_blob(raw: bytes) -> Optional[SessionData]:
+    try:
+        if raw[:1] == _BLOB_V1:
+            return _blob_decoder.decode(memoryview(raw)[1:])
+        if raw[:1] == b"{":
+            return _legacy_blob_decoder.decode(raw)
+    except msgspec.DecodeError:
+        pass
+    return None
+
+
+class _RedisHashSessions:
+    """
+    Общее для сессий в хэшах Redis: запись и удаление полей вместе
+    с продлением TTL одним конвейером, полное (HGETALL со скользящим
+    TTL) и частичное (HMGET) чтение.
+    """
+
+    ttl: int
 
     def __init__(self, redis: Redis) -> None:
         self._redis = redis
+        self._read_script = redis.register_script(_READ)
+        self._delete_script = redis.register_script(_DELETE)
+
+    def _key(self, id: UUID) -> str:
+        return f"{_KEY_PREFIX}{id.hex}"
+
+    def _write(
+        self, id: UUID, fields: dict[str, bytes], removed: Iterable[str] = ()
+    ) -> None:
+        key = self._key(id)
+        pipe = self._redis.pipeline()
+        mapping = {_VERSION_FIELD: _HASH_VERSION, **fields}
+        pipe.hset(key, mapping=cast(Mapping[EncodableT, EncodableT], mapping))
+        if removed := [_DATA_PREFIX + name for name in removed]:
+            pipe.hdel(key, *removed)
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def _read_all(self, id: UUID) -> dict[bytes, bytes]:
+        flat = cast(
+            list[bytes],
+            self._read_script(
+                keys=[self._key(id)], args=[self.ttl, _USER_INDEX_PREFIX]
+            ),
+        )
+        return dict(zip(flat[::2], flat[1::2]))
+
+    def flush(self, id: UUID, changed: dict[str, Any], removed: list[str]) -> bool:
+        self._write(id, encode_fields(changed), removed)
+        return True
+
+    def read_fields(self, id: UUID, keys: list[str]) -> dict[str, Any]:
+        if not keys:
+            return {}
+        values = cast(
+            list[Optional[bytes]],
+            self._redis.hmget(self._key(id), [_DATA_PREFIX + key for key in keys]),
+        )
+        return {
+            key: _value_decoder.decode(value)
+            for key, value in zip(keys, values)
+            if value is not None
+        }
+
+    def delete(self, id: UUID) -> None:
+        self._delete_script(
+            keys=[self._key(id), id.hex], args=[_USER_INDEX_PREFIX, id.hex]
+        )
+
+
+class RedisSessionBackend(_RedisHashSessions, UserSessionBackendProtocol):
+    """Управление авторизованными сессиями в Redis."""
+
+    ttl = 3600
+
+    def __init__(self, redis: Redis) -> None:
+        super().__init__(redis)
+        self._flush_script = redis.register_script(_FLUSH)
+        self._index_script = redis.register_script(_INDEX)
+        self._revoke_script = redis.register_script(_REVOKE)
+
+    def _write_indexed(self, id: UUID, data: SessionData) -> None:
+        """
+        Сессия целиком и её запись в индексе пользователя — в одной
+        транзакции. Ключ прежнего формата, если он был, удаляется.
+        """
+        key = self._key(id)
+        pipe = self._redis.pipeline()
+        mapping = encode_session(data)
+        pipe.hset(key, mapping=cast(Mapping[EncodableT, EncodableT], mapping))
+        pipe.expire(key, self.ttl)
+        pipe.delete(id.hex)
+        # у гостевой сессии прежнего формата пользователь — сам id сессии:
+        # индексировать её незачем, «выйти везде» к ней не относится
+        if data.user_id != id:
+            self._index_script(
+                keys=[f"{_USER_INDEX_PREFIX}{data.user_id.hex}"],
+                args=[id.hex, _KEY_PREFIX, self.ttl],
+                client=pipe,
+            )
+        pipe.execute()
 
     def create(self, id: UUID, data: SessionData) -> UUID:
-        self._redis.set(id.hex, json.dumps(asdict(data)), ex=3600)
+        self._write_indexed(id, data)
         return id
 
+    def _read_blob(self, id: UUID) -> Optional[SessionData]:
+        blob = cast(Optional[bytes], self._redis.get(id.hex))
+        return None if blob is None else _decode_blob(blob)
+
     def read(self, id: UUID) -> Optional[SessionData]:
-        raw = cast(Optional[bytes], self._redis.get(id.hex))
-        return None if raw is None else SessionData(**json.loads(raw.decode("utf-8")))
+        if raw := self._read_all(id):
+            return decode_session(id, raw)
+        # ключ прежнего формата: сразу переносим сессию в хэш, чтобы она
+        # попала в индекс пользователя и «выйти везде» её видел
+        if (data := self._read_blob(id)) is not None:
+            self._write_indexed(id, data)
+        return data
 
     def update(self, id: UUID, data: SessionData) -> None:
-        self._redis.set(id.hex, json.dumps(asdict(data)), ex=3600)
+        self._write_indexed(id, data)
 
-    def delete(self, id: UUID) -> None:
-        self._redis.delete(id.hex)
+    def flush(self, id: UUID, changed: dict[str, Any], removed: list[str]) -> bool:
+        fields = encode_fields(changed)
+        args: list[EncodableT] = [
+            self.ttl, _HASH_VERSION, _USER_INDEX_PREFIX, len(fields)
+        ]
+        for field, value in fields.items():
+            args += (field, value)
+        args += [_DATA_PREFIX + key for key in removed]
+        written = self._flush_script(keys=[self._key(id), id.hex], args=args)
+        if written:
+            return written > 0
+        # сессия ещё в прежнем формате: переносим её целиком вместе
+        # с id пользователя и записью в индексе, изменения — поверх
+        if (data := self._read_blob(id)) is None:
+            return False
+        data.data |= changed
+        for key in removed:
+            data.data.pop(key, None)
+        self._write_indexed(id, data)
+        return True
 
+    def revoke_user(self, user_id: UUID) -> int:
+        return cast(
+            int,
+            self._revoke_script(
+                keys=[f"{_USER_INDEX_PREFIX}{user_id.hex}"], args=[_KEY_PREFIX]
+            ),
+        )
 
-class GuestSessionBackend(GuestSessionBackendProtocol):
+
+class GuestSessionBackend(_RedisHashSessions, GuestSessionBackendProtocol):
     """Управление гостевыми сессиями в Redis."""
 
+    ttl = 1800
+
     def __init__(self, redis: Redis) -> None:
-        self._redis = redis
+        super().__init__(redis)
+        self._merge = redis.register_script(_MERGE)
 
     def create(self, id: UUID, data: dict[str, Any]) -> UUID:
-        self._redis.set(id.hex, json.dumps(data), ex=1800)
+        self._write(id, encode_fields(data))
         return id
 
     def read(self, id: UUID) -> Optional[dict[str, Any]]:
-        raw = cast(Optional[bytes], self._redis.get(id.hex))
-        return None if raw is None else json.loads(raw.decode("utf-8"))
+        return decode_fields(raw) if (raw := self._read_all(id)) else None
 
     def update(self, id: UUID, data: dict[str, Any]) -> None:
-        raw = cast(Optional[bytes], self._redis.get(id.hex))
-        current: dict[str, Any] = json.loads(raw.decode("utf-8")) if raw else {}
-        current |= data
-        self._redis.set(id.hex, json.dumps(current), ex=1800)
+        self._write(id, encode_fields(data))
 
-    def delete(self, id: UUID) -> None:
-        self._redis.delete(id.hex)
+    def merge_into(self, id: UUID, target: UUID) -> bool:
+        moved = self._merge(
+            keys=[self._key(id), self._key(target)],
+            args=[RedisSessionBackend.ttl, _HASH_VERSION, _USER_INDEX_PREFIX],
+        )
+        return cast(int, moved) >= 0
 
 
 class CustomSession(SessionBase):
+    """
+    Ленивая сессия: Redis читается при первом обращении к данным, а
+    в save() уходят только изменённые и удалённые ключи — одним
+    обращением вместе с продлением TTL. Запросы, которые сессию
+    не трогают (чтение каталога), обходятся без Redis вовсе; запись
+    без чтения не загружает сессию. Запрос, который и читает, и пишет,
+    обходится двумя обращениями: чтение нужно вьюхе до того, как
+    известно, что она запишет, поэтому объединить их нельзя.
+    stored — есть ли под session_id ключ в Redis: у новой сессии его
+    нет, и он появляется только при первой настоящей записи.
+    revoked — бэкенд отказался писать, потому что сессии уже нет
+    (отозвана или истекла); cookie такой сессии надо удалить.
+    Гостевая сессия пишется через гостевой бэкенд с его TTL; её
+    пользователь — сам id сессии.
+    """
+
     def __init__(
-        self, 
-        session_id: UUID, 
-        session_data: SessionData, 
-        backend: SessionStorageProtocol
+        self,
+        session_id: Optional[UUID],
+        stored: bool,
+        backend: UserSessionBackendProtocol | GuestSessionBackendProtocol,
+        uuid_generator: UUIDGenerator,
     ) -> None:
         super().__init__()
         self.session_id = session_id
-        self._session_data = session_data
+        self.stored = stored and session_id is not None
         self.backend = backend
+        self._uuid_generator = uuid_generator
+        self._session_data: Optional[SessionData] = None
+        # изменения с начала запроса, которые save() отправит в Redis
+        self._changed: dict[str, Any] = {}
+        self._removed: set[str] = set()
         self.modified = False
+        self.revoked = False
+
+    @property
+    def raw(self) -> SessionData:
+        if self._session_data is None:
+            self.accessed = True
+            data: Optional[SessionData] = None
+            if self.stored:
+                data = self._load(cast(UUID, self.session_id))
+            if data is None:
+                # ключа нет или он истёк: пустая сессия только в памяти
+                self.session_id = self.session_id or self._uuid_generator()
+                data = SessionData(user_id=self.session_id, data={})
+                self.stored = False
+            # записи, сделанные до загрузки, поверх прочитанного
+            data.data |= self._changed
+            for key in self._removed:
+                data.data.pop(key, None)
+            self._session_data = data
+        return self._session_data
+
+    def _load(self, id: UUID) -> Optional[SessionData]:
+        loaded = self.backend.read(id)
+        if isinstance(loaded, dict):
+            return SessionData(user_id=id, data=loaded)
+        return loaded
+
+    def _touch(self) -> None:
+        self.accessed = True
+        self.modified = True
+        if self.session_id is None:
+            self.session_id = self._uuid_generator()
 
     def __getitem__(self, key) -> Any:
-        return self._session_data.data[key]
+        return self.raw.data[key]
 
     def __setitem__(self, key, value) -> None:
-        self._session_data.data[key] = value
-        self.modified = True
+        self._touch()
+        self._changed[key] = value
+        self._removed.discard(key)
+        if self._session_data is not None:
+            self._session_data.data[key] = value
 
     def __delitem__(self, key) -> None:
-        del self._session_data.data[key]
-        self.modified = True
+        del self.raw.data[key]
+        self._touch()
+        self._changed.pop(key, None)
+        self._removed.add(key)
 
     def __contains__(self, key) -> bool:
-        return key in self._session_data.data
+        return key in self.raw.data
 
     def get(self, key, default=None) -> Any | None:
-        return self._session_data.data.get(key, default)
+        return self.raw.data.get(key, default)
 
     @property
     def session_key(self) -> str:
+        if self.session_id is None:
+            self.raw  # id новой сессии выдаётся при загрузке
         return str(self.session_id)
 
     @property
     def user_id(self) -> UUID:
-        return self._session_data.user_id
-
-    @property
-    def raw(self) -> SessionData:
-        return self._session_data
+        return self.raw.user_id
 
     def save(self, must_create: bool = False) -> None:
-        if self.modified:
-            self.backend.update(self.session_id, self._session_data)
-            self.modified = False
-
+        if not self.modified:
+            return
+        removed = list(self._removed) if self.stored else []
+        written = self.backend.flush(
+            cast(UUID, self.session_id), self._changed, removed
+        )
+        self._changed = {}
+        self._removed.clear()
+        self.modified = False
+        self.stored = written
+        self.revoked = not written
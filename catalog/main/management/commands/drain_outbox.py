@@ -0,0 +1,49 @@
+import time
+
+from config import Config
+from container import container
+from django.core.management.base import BaseCommand, CommandParser
+
+from main.infrastructure.outbox import OutboxDrainer
+
+
+class Command(BaseCommand):
+    help = (
+        "Разбирает outbox и раздаёт события обработчикам. Можно запускать "
+        "несколько экземпляров: пачки делятся через FOR UPDATE SKIP LOCKED."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=None,
+            help="пауза в секундах, когда очередь пуста",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="разобрать всё, что есть, и выйти",
+        )
+
+    def handle(self, *args, **options) -> None:
+        config = container.get(Config).outbox
+        batch_size = options["batch_size"] or config.batch_size
+        interval = options["interval"] or config.poll_interval
+        drainer = container.get(OutboxDrainer)
+
+        total = 0
+        try:
+            while True:
+                taken = drainer.drain(batch_size)
+                total += taken
+                if taken == batch_size:
+                    # очередь не пуста — следующая пачка сразу
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f"drained {total} events")
@@ -36,6 +36,11 @@ urlpatterns = [
         name="user_change_email"
     ),
     path("products/", products.products_view, name="products_list"),
+    path(
+        "products/batch/", 
+        products.product_batch_view, 
+        name="product_batch"
+    ),
     path(
         "products/<int:product_id>/", 
         products.product_detail_view, 
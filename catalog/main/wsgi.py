@@ -11,7 +11,9 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'main.settings')
 
 from container import container  # noqa: I001
 from main.integrations import setup_dishka
+from products.infrastructure.warmup import warm_on_startup
 
 setup_dishka(container)
+warm_on_startup(container)
 
 application = get_wsgi_application()
@@ -2,6 +2,7 @@ import os
 from logging.config import fileConfig
 
 from alembic import context
+from main.infrastructure import outbox  # noqa: F401
 from main.infrastructure.db import Base
 from products.infrastructure import models as products  # noqa: F401
 from sqlalchemy import engine_from_config, pool
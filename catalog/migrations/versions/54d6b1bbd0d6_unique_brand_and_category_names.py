@@ -0,0 +1,82 @@
+"""unique brand and category names
+
+Revision ID: 54d6b1bbd0d6
+Revises: 8d2e5e322468
+Create Date: 2025-11-21 09:32:17.604113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '54d6b1bbd0d6'
+down_revision: Union[str, Sequence[str], None] = '8d2e5e322468'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Схлопываем дубликаты, накопившиеся из-за гонок, на минимальный id
+    op.execute(
+        """
+        UPDATE products AS p
+        SET brand_id = d.keep_id
+        FROM (
+            SELECT id, min(id) OVER (PARTITION BY name) AS keep_id FROM brands
+        ) AS d
+        WHERE p.brand_id = d.id AND d.id <> d.keep_id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM brands AS b
+        USING brands AS k
+        WHERE b.name = k.name AND b.id > k.id
+        """
+    )
+    op.execute(
+        """
+        CREATE TEMPORARY TABLE category_dups ON COMMIT DROP AS
+        SELECT id, keep_id FROM (
+            SELECT id, min(id) OVER (PARTITION BY name) AS keep_id FROM categories
+        ) AS c
+        WHERE id <> keep_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO product_categories (product_id, category_id)
+        SELECT pc.product_id, d.keep_id
+        FROM product_categories AS pc
+        JOIN category_dups AS d ON d.id = pc.category_id
+        ON CONFLICT DO NOTHING
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM product_categories
+        WHERE category_id IN (SELECT id FROM category_dups)
+        """
+    )
+    op.execute(
+        """
+        UPDATE categories AS c
+        SET parent_category_id = d.keep_id
+        FROM category_dups AS d
+        WHERE c.parent_category_id = d.id
+        """
+    )
+    op.execute("DELETE FROM categories WHERE id IN (SELECT id FROM category_dups)")
+
+    op.create_index(op.f('ix_brands_name'), 'brands', ['name'], unique=True)
+    op.create_index(op.f('ix_categories_name'), 'categories', ['name'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_categories_name'), table_name='categories')
+    op.drop_index(op.f('ix_brands_name'), table_name='brands')
@@ -0,0 +1,40 @@
+"""keyset pagination indexes
+
+Revision ID: 7861236fddee
+Revises: 54d6b1bbd0d6
+Create Date: 2025-11-24 15:02:56.771340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7861236fddee'
+down_revision: Union[str, Sequence[str], None] = '54d6b1bbd0d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_products_name_id', 'products', ['name', 'id'], unique=False)
+    op.create_index(
+        'ix_products_current_price_id',
+        'products',
+        ['current_price', 'id'],
+        unique=False,
+    )
+    # (current_price, id) покрывает и сортировку по одной цене
+    op.drop_index(op.f('ix_products_current_price'), table_name='products')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        op.f('ix_products_current_price'), 'products', ['current_price'], unique=False
+    )
+    op.drop_index('ix_products_current_price_id', table_name='products')
+    op.drop_index('ix_products_name_id', table_name='products')
@@ -0,0 +1,48 @@
+"""add current price to products
+
+Revision ID: 8d2e5e322468
+Revises: 42f95aaccd26
+Create Date: 2025-11-20 12:10:41.218904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2e5e322468'
+down_revision: Union[str, Sequence[str], None] = '42f95aaccd26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', sa.Column('current_price', sa.Float(), nullable=True))
+    op.add_column('products', sa.Column('current_currency', sa.String(), nullable=True))
+    op.create_index(
+        op.f('ix_products_current_price'), 'products', ['current_price'], unique=False
+    )
+    # backfill: последняя по valid_from цена каждого продукта
+    op.execute(
+        """
+        UPDATE products AS p
+        SET current_price = lp.price,
+            current_currency = lp.currency
+        FROM (
+            SELECT DISTINCT ON (product_id) product_id, price, currency
+            FROM prices
+            ORDER BY product_id, valid_from DESC
+        ) AS lp
+        WHERE lp.product_id = p.id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_products_current_price'), table_name='products')
+    op.drop_column('products', 'current_currency')
+    op.drop_column('products', 'current_price')
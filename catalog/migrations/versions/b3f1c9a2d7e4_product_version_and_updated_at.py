@@ -0,0 +1,42 @@
+"""product version and updated_at
+
+Revision ID: b3f1c9a2d7e4
+Revises: 7861236fddee
+Create Date: 2025-12-01 11:20:14.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f1c9a2d7e4'
+down_revision: Union[str, Sequence[str], None] = '7861236fddee'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # оба умолчания не volatile, поэтому Postgres не переписывает таблицу
+    op.add_column(
+        'products',
+        sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+    )
+    op.add_column(
+        'products',
+        sa.Column(
+            'updated_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('products', 'updated_at')
+    op.drop_column('products', 'version')
@@ -0,0 +1,48 @@
+"""cascade product children
+
+Revision ID: c7d4e1a9b2f6
+Revises: e5a8d2c41f03
+Create Date: 2025-12-08 10:14:51.207634
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d4e1a9b2f6'
+down_revision: Union[str, Sequence[str], None] = 'e5a8d2c41f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# все таблицы со ссылкой products.id; имена ограничений — умолчания Postgres
+_CHILDREN = (
+    'inventory',
+    'media',
+    'prices',
+    'product_attributes',
+    'product_categories',
+    'product_tags',
+    'reviews',
+    'variants',
+)
+
+
+def _recreate(ondelete: Union[str, None]) -> None:
+    for table in _CHILDREN:
+        name = f'{table}_product_id_fkey'
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(
+            name, table, 'products', ['product_id'], ['id'], ondelete=ondelete
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _recreate('CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _recreate(None)
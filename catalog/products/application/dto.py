@@ -1,7 +1,9 @@
+import datetime
 from typing import Iterable, List
 
 import msgspec
 
+from products.application.types import CountMode
 from products.domain.entities import ProductDM
 
 
@@ -30,8 +32,37 @@ class ProductDTO(msgspec.Struct):
             categories=product.categories,
             in_stock=product.in_stock,
             media_urls=product.media_urls,
+            currency=product.currency,
         )
 
     @classmethod
     def from_iterable(cls, products: Iterable[ProductDM]) -> list["ProductDTO"]:
         return [cls.from_entity(p) for p in products]
+
+
+class ProductPageDTO(msgspec.Struct):
+    items: List[ProductDTO]
+    page: int
+    page_size: int
+    total: int | None
+    count_mode: CountMode
+    has_more: bool
+    next_cursor: str | None = None
+
+
+class ProductBatchDTO(msgspec.Struct):
+    items: List[ProductDTO]
+    missing: List[int]
+
+
+class ProductVersionDTO(msgspec.Struct):
+    """Валидаторы карточки для условного GET (ETag / Last-Modified)."""
+
+    id: int
+    version: int
+    updated_at: datetime.datetime
+
+
+class StockDTO(msgspec.Struct):
+    id: int
+    in_stock: int
@@ -0,0 +1,11 @@
+class ProductNotFoundError(Exception):
+    def __init__(self, product_id: int) -> None:
+        self.product_id = product_id
+        super().__init__(f"Product {product_id} not found")
+
+
+class InsufficientStockError(Exception):
+    def __init__(self, product_id: int, requested: int) -> None:
+        self.product_id = product_id
+        self.requested = requested
+        super().__init__(f"Insufficient stock for product {product_id}")
@@ -1,8 +1,23 @@
-from typing import List, Optional, Tuple
-
-from products.application.dto import ProductDTO
+import hashlib
+from typing import List, Optional
+
+import msgspec
+
+from products.application.dto import (
+    ProductBatchDTO,
+    ProductDTO,
+    ProductPageDTO,
+    ProductVersionDTO,
+    StockDTO,
+)
+from products.application.interfaces import (
+    MissingProductsCacheProtocol,
+    ProductDetailCacheProtocol,
+    ProductListCache,
+)
+from products.application.pagination import ProductCursor
 from products.application.services import ProductService
-from products.application.types import SortFields
+from products.application.types import ProductFilters, SortFields
 from products.domain.entities import ProductDM
 
 
@@ -21,15 +36,113 @@ class GetProductInteractor:
         self.service = service
 
     def execute(self, product_id: int) -> Optional[ProductDTO]:
-        product = self.service.get_product(product_id)
-        return ProductDTO.from_entity(product) if product else None
+        return self.service.read_product(product_id)
+
+
+class GetProductVersionInteractor:
+    """
+    Валидаторы карточки для условного GET: по ним отвечают 304, не строя
+    DTO. Отсутствующие id запоминаются в отрицательном кэше.
+    """
+
+    def __init__(
+        self,
+        service: ProductService,
+        missing: MissingProductsCacheProtocol,
+    ) -> None:
+        self.service = service
+        self.missing = missing
+
+    def execute(self, product_id: int) -> Optional[ProductVersionDTO]:
+        if self.missing.is_missing(product_id):
+            return None
+        version = self.service.read_version(product_id)
+        if version is None:
+            self.missing.mark_missing(product_id)
+        return version
+
+
+class CachedGetProductInteractor:
+    """
+    Read-through кэш поверх GetProductInteractor: отдаёт карточку уже
+    закодированной в JSON, на попадании без обращения к БД и без encode.
+    Версия берётся из GetProductVersionInteractor и входит в ключ.
+    """
+
+    def __init__(
+        self,
+        inner: GetProductInteractor,
+        cache: ProductDetailCacheProtocol,
+    ) -> None:
+        self.inner = inner
+        self.cache = cache
+
+    def execute(self, product_id: int, version: int) -> Optional[bytes]:
+        if (payload := self.cache.get(product_id, version)) is not None:
+            return payload
+        product = self.inner.execute(product_id)
+        if product is None:
+            return None
+        payload = msgspec.json.encode(product)
+        self.cache.set(product_id, version, payload)
+        return payload
+
+
+class WarmProductDetailsInteractor:
+    """
+    Прогрев кэша карточек пачкой id: версии одним запросом, уже тёплые
+    пары (id, version) отсеиваются по кэшу, остальные карточки читаются
+    одной проекцией и пишутся в кэш одним вызовом. Возвращает число
+    прогретых карточек.
+    """
+
+    def __init__(
+        self,
+        service: ProductService,
+        cache: ProductDetailCacheProtocol,
+    ) -> None:
+        self.service = service
+        self.cache = cache
+
+    def execute(self, product_ids: List[int]) -> int:
+        versions = {v.id: v.version for v in self.service.read_versions(product_ids)}
+        warm = self.cache.get_many(versions.items())
+        cold = [i for i, version in versions.items() if (i, version) not in warm]
+        payloads = {
+            (product.id, versions[product.id]): msgspec.json.encode(product)
+            for product in self.service.read_products(cold)
+        }
+        self.cache.set_many(payloads)
+        return len(payloads)
+
+
+class ProductCacheStatsInteractor:
+    def __init__(self, cache: ProductDetailCacheProtocol) -> None:
+        self.cache = cache
+
+    def execute(self) -> dict[str, int]:
+        return self.cache.stats()
+
+
+class GetProductsBatchInteractor:
+    def __init__(self, service: ProductService) -> None:
+        self.service = service
+
+    def execute(self, product_ids: List[int]) -> ProductBatchDTO:
+        return self.service.get_products(product_ids)
 
 
 class UpdateProductInteractor:
     def __init__(self, service: ProductService) -> None:
         self.service = service
 
-    def execute(self, product: ProductDM) -> ProductDTO:
+    def execute(
+        self, product: ProductDM, in_stock: Optional[int] = None
+    ) -> ProductDTO:
+        # остаток задаётся отдельным UPDATE: прочитанное ранее значение
+        # не должно перезаписывать параллельные продажи
+        if in_stock is not None:
+            self.service.set_stock(product.id, in_stock)
         updated = self.service.update_product(product)
         return ProductDTO.from_entity(updated)
 
@@ -53,7 +166,9 @@ class ListProductsInteractor:
         page_size: int = 20,
         sort_by: SortFields | None = None,
         descending: bool = False,
-    ) -> Tuple[List[ProductDTO], int]:
+        filters: ProductFilters | None = None,
+        after: ProductCursor | None = None,
+    ) -> ProductPageDTO:
         page = max(page, 1)
         if page_size < 1:
             page_size = 20
@@ -63,9 +178,50 @@ class ListProductsInteractor:
             page_size=page_size,
             sort_by=sort_by,
             descending=descending,
+            filters=filters,
+            after=after,
         )
 
 
+class CachedListProductsInteractor:
+    """
+    Кэш закодированных страниц списка поверх ListProductsInteractor.
+    Истёкшую страницу пересчитывает один воркер (см. SingleFlightCache),
+    стратегия задаётся политикой семейства ключей "products:list".
+    Кэшируются только первые max_page страниц без курсора: у каждого
+    курсора свой ключ, и обход каталога вглубь заполнял бы кэш без предела.
+    """
+
+    def __init__(
+        self,
+        inner: ListProductsInteractor,
+        cache: ProductListCache,
+        max_page: int,
+    ) -> None:
+        self.inner = inner
+        self.cache = cache
+        self.max_page = max_page
+
+    def execute(
+        self,
+        page: int = 1,
+        page_size: int = 20,
+        sort_by: SortFields | None = None,
+        descending: bool = False,
+        filters: ProductFilters | None = None,
+        after: ProductCursor | None = None,
+    ) -> bytes:
+        params = (page, page_size, sort_by, descending, filters, after)
+
+        def compute() -> bytes:
+            return msgspec.json.encode(self.inner.execute(*params))
+
+        if after is not None or page > self.max_page:
+            return compute()
+        key = hashlib.blake2b(msgspec.json.encode(params), digest_size=16).hexdigest()
+        return self.cache.get_or_compute(key, compute)
+
+
 # --- Логика цен ---
 class SetPriceInteractor:
     def __init__(self, service: ProductService) -> None:
@@ -111,35 +267,35 @@ class RestockProductInteractor:
     def __init__(self, service: ProductService) -> None:
         self.service = service
 
-    def execute(self, product: ProductDM, amount: int) -> ProductDTO:
-        updated = self.service.restock(product, amount)
-        return ProductDTO.from_entity(updated)
+    def execute(self, product_id: int, amount: int) -> StockDTO:
+        quantity = self.service.restock(product_id, amount)
+        return StockDTO(id=product_id, in_stock=quantity)
 
 
 class SellProductInteractor:
     def __init__(self, service: ProductService) -> None:
         self.service = service
 
-    def execute(self, product: ProductDM, amount: int = 1) -> ProductDTO:
-        updated = self.service.sell(product, amount)
-        return ProductDTO.from_entity(updated)
+    def execute(self, product_id: int, amount: int = 1) -> StockDTO:
+        quantity = self.service.sell(product_id, amount)
+        return StockDTO(id=product_id, in_stock=quantity)
 
 
 class ReserveProductInteractor:
     def __init__(self, service: ProductService) -> None:
         self.service = service
 
-    def execute(self, product: ProductDM, amount: int) -> bool:
-        return self.service.reserve(product, amount)
+    def execute(self, product_id: int, amount: int) -> bool:
+        return self.service.reserve(product_id, amount)
 
 
 class ReleaseProductInteractor:
     def __init__(self, service: ProductService) -> None:
         self.service = service
 
-    def execute(self, product: ProductDM, amount: int) -> ProductDTO:
-        updated = self.service.release(product, amount)
-        return ProductDTO.from_entity(updated)
+    def execute(self, product_id: int, amount: int) -> StockDTO:
+        quantity = self.service.release(product_id, amount)
+        return StockDTO(id=product_id, in_stock=quantity)
 
 
 class StockStatusInteractor:
@@ -1,10 +1,36 @@
-from typing import List, Optional, Protocol
+from typing import Iterable, List, Optional, Protocol, Tuple
 
-from products.application.types import SortFields
+from main.application.interfaces import CacheProtocol, SingleFlightCacheProtocol
+
+from products.application.dto import ProductDTO, ProductVersionDTO
+from products.application.pagination import CursorKey
+from products.application.types import CountMode, ProductFilters, SortFields
 
 from ..domain.entities import ProductDM
 
 
+# Именованные экземпляры двухуровневого кэша для DI: отдельный протокол
+# на каждый namespace, реализация у всех общая
+class ProductCache(CacheProtocol, Protocol):
+    pass
+
+
+class BrandCache(CacheProtocol, Protocol):
+    pass
+
+
+class CategoryCache(CacheProtocol, Protocol):
+    pass
+
+
+class TagCache(CacheProtocol, Protocol):
+    pass
+
+
+class ProductListCache(SingleFlightCacheProtocol, Protocol):
+    pass
+
+
 class ProductRepositoryProtocol(Protocol):
     def get_all(
         self,
@@ -12,10 +38,12 @@ class ProductRepositoryProtocol(Protocol):
         limit: int = 20,
         sort_by: SortFields | None = None,
         descending: bool = False,
+        filters: ProductFilters | None = None,
+        after: Tuple[CursorKey, int] | None = None,
     ) -> List[ProductDM]: 
         raise NotImplementedError()
 
-    def count(self) -> int:
+    def count(self, filters: ProductFilters | None = None) -> int:
         raise NotImplementedError()
 
     def get_by_id(self, product_id: int) -> Optional[ProductDM]:
@@ -29,3 +57,125 @@ class ProductRepositoryProtocol(Protocol):
 
     def delete(self, product_id: int) -> None:
         raise NotImplementedError()
+
+    def exists(self, product_id: int) -> bool:
+        raise NotImplementedError()
+
+    # --- Склад: атомарные операции, остаток меняется в самом UPDATE ---
+    def increment_stock(self, product_id: int, amount: int) -> Optional[int]:
+        """Новый остаток; None — продукта нет."""
+        raise NotImplementedError()
+
+    def decrement_stock(self, product_id: int, amount: int) -> Optional[int]:
+        """Новый остаток; None — остатка не хватает или продукта нет."""
+        raise NotImplementedError()
+
+    def set_stock(self, product_id: int, quantity: int) -> None:
+        raise NotImplementedError()
+
+
+class ProductReaderProtocol(Protocol):
+    """Read-only выборки, отдающие готовые ProductDTO без ORM-сущностей."""
+
+    def get_by_id(self, product_id: int) -> Optional[ProductDTO]:
+        raise NotImplementedError()
+
+    def get_version(self, product_id: int) -> Optional[ProductVersionDTO]:
+        raise NotImplementedError()
+
+    def get_many(self, product_ids: List[int]) -> List[ProductDTO]:
+        """Пачка карточек одним запросом; порядок не гарантирован."""
+        raise NotImplementedError()
+
+    def get_versions(self, product_ids: List[int]) -> List[ProductVersionDTO]:
+        raise NotImplementedError()
+
+    def get_page(
+        self,
+        offset: int = 0,
+        limit: int = 20,
+        sort_by: SortFields | None = None,
+        descending: bool = False,
+        filters: ProductFilters | None = None,
+        after: Tuple[CursorKey, int] | None = None,
+    ) -> List[ProductDTO]:
+        raise NotImplementedError()
+
+
+class ProductCounterProtocol(Protocol):
+    """Стратегия подсчёта total для списка продуктов."""
+
+    def count(
+        self, filters: ProductFilters | None = None
+    ) -> Tuple[Optional[int], CountMode]:
+        """Вернуть total (None, если не считается) и фактически применённый режим."""
+        raise NotImplementedError()
+
+    def invalidate(self) -> None:
+        """Сбросить закэшированные значения после создания/удаления продукта."""
+        raise NotImplementedError()
+
+
+class ProductDetailCacheProtocol(Protocol):
+    """
+    Кэш закодированной карточки продукта (JSON-байты ProductDTO).
+    Ключ включает версию строки, поэтому запись не требует сброса:
+    после изменения продукта старые версии просто перестают читаться.
+    """
+
+    def get(self, product_id: int, version: int) -> Optional[bytes]:
+        raise NotImplementedError()
+
+    def set(self, product_id: int, version: int, payload: bytes) -> None:
+        raise NotImplementedError()
+
+    def get_many(
+        self, keys: Iterable[Tuple[int, int]]
+    ) -> dict[Tuple[int, int], bytes]:
+        """Карточки по парам (id, version); отсутствующих в ответе нет."""
+        raise NotImplementedError()
+
+    def set_many(self, payloads: dict[Tuple[int, int], bytes]) -> None:
+        raise NotImplementedError()
+
+    def stats(self) -> dict[str, int]:
+        """Счётчики попаданий и промахов."""
+        raise NotImplementedError()
+
+
+class HotProductsProtocol(Protocol):
+    """Статистика обращений к карточкам — источник id для прогрева кэша."""
+
+    def record(self, product_id: int) -> None:
+        raise NotImplementedError()
+
+    def top(self, limit: int) -> List[int]:
+        """Самые запрашиваемые id за окно статистики, по убыванию."""
+        raise NotImplementedError()
+
+
+class ProductCountCacheProtocol(Protocol):
+    """Закэшированные total списка продуктов по набору фильтров."""
+
+    def get(self, filters: ProductFilters | None = None) -> Optional[int]:
+        raise NotImplementedError()
+
+    def set(self, filters: ProductFilters | None, total: int) -> None:
+        raise NotImplementedError()
+
+    def invalidate(self) -> None:
+        """Сбросить все варианты фильтров разом."""
+        raise NotImplementedError()
+
+
+class MissingProductsCacheProtocol(Protocol):
+    """Короткоживущий отрицательный кэш id, для которых продукта нет."""
+
+    def is_missing(self, product_id: int) -> bool:
+        raise NotImplementedError()
+
+    def mark_missing(self, product_id: int) -> None:
+        raise NotImplementedError()
+
+    def forget(self, product_id: int) -> None:
+        raise NotImplementedError()
@@ -0,0 +1,57 @@
+import base64
+import binascii
+
+import msgspec
+
+from products.application.dto import ProductDTO
+from products.application.types import SortFields
+
+CursorKey = str | float | int | None
+
+# допустимые типы ключа курсора для каждого поля сортировки: ключ уходит
+# в сравнение с колонкой, и чужой тип дал бы ошибку Postgres, а не 400
+_KEY_TYPES: dict[SortFields | None, tuple[type, ...]] = {
+    None: (int, type(None)),
+    "id": (int, type(None)),
+    "name": (str,),
+    "price": (int, float, type(None)),
+}
+
+
+class ProductCursor(msgspec.Struct, array_like=True, frozen=True):
+    """Позиция последней отданной строки: (ключ сортировки, id)."""
+
+    sort_by: SortFields | None
+    descending: bool
+    key: CursorKey
+    id: int
+
+
+def encode_cursor(cursor: ProductCursor) -> str:
+    raw = base64.urlsafe_b64encode(msgspec.json.encode(cursor))
+    return raw.rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(value: str) -> ProductCursor:
+    padded = value + "=" * (-len(value) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(padded.encode("ascii"))
+        cursor = msgspec.json.decode(raw, type=ProductCursor)
+    except (binascii.Error, UnicodeEncodeError, msgspec.DecodeError) as e:
+        raise ValueError("Malformed cursor") from e
+    if not isinstance(cursor.key, _KEY_TYPES[cursor.sort_by]):
+        raise ValueError("Cursor key does not match sort field")
+    return cursor
+
+
+def cursor_after(
+    product: ProductDTO,
+    sort_by: SortFields | None,
+    descending: bool,
+) -> ProductCursor:
+    key: CursorKey = None
+    if sort_by == "name":
+        key = product.name
+    elif sort_by == "price":
+        key = product.price
+    return ProductCursor(sort_by, descending, key, product.id)
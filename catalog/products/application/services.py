@@ -1,28 +1,64 @@
-from typing import List, Optional, Tuple
+from typing import List, Optional
 
-from products.application.types import SortFields
+from products.application.types import ProductFilters, SortFields
 
 from ..domain.entities import ProductDM
-from .dto import ProductDTO
-from .interfaces import ProductRepositoryProtocol
+from .dto import ProductBatchDTO, ProductDTO, ProductPageDTO, ProductVersionDTO
+from .errors import InsufficientStockError, ProductNotFoundError
+from .interfaces import (
+    ProductCounterProtocol,
+    ProductReaderProtocol,
+    ProductRepositoryProtocol,
+)
+from .pagination import ProductCursor, cursor_after, encode_cursor
 
 
 class ProductService:
-    def __init__(self, repo: ProductRepositoryProtocol) -> None:
+    def __init__(
+        self,
+        repo: ProductRepositoryProtocol,
+        counter: ProductCounterProtocol,
+        reader: ProductReaderProtocol,
+    ) -> None:
         self.repo = repo
+        self.counter = counter
+        self.reader = reader
 
     # --- CRUD ---
     def create_product(self, product: ProductDM) -> ProductDM:
-        return self.repo.add(product)
+        created = self.repo.add(product)
+        self.counter.invalidate()
+        return created
 
     def get_product(self, product_id: int) -> Optional[ProductDM]:
         return self.repo.get_by_id(product_id)
 
+    def read_product(self, product_id: int) -> Optional[ProductDTO]:
+        return self.reader.get_by_id(product_id)
+
+    def read_version(self, product_id: int) -> Optional[ProductVersionDTO]:
+        return self.reader.get_version(product_id)
+
+    def read_products(self, product_ids: List[int]) -> List[ProductDTO]:
+        return self.reader.get_many(product_ids)
+
+    def read_versions(self, product_ids: List[int]) -> List[ProductVersionDTO]:
+        return self.reader.get_versions(product_ids)
+
+    def get_products(self, product_ids: List[int]) -> ProductBatchDTO:
+        """Продукты в порядке запроса и список id, которых нет."""
+        found = {p.id: p for p in self.reader.get_many(product_ids)}
+        return ProductBatchDTO(
+            items=[found[i] for i in product_ids if i in found],
+            missing=[i for i in product_ids if i not in found],
+        )
+
     def update_product(self, product: ProductDM) -> ProductDM:
         return self.repo.update(product)
 
     def delete_product(self, product_id: int) -> None:
         self.repo.delete(product_id)
+        self.counter.invalidate()
 
     # --- LISTING ---
     def list_products(
@@ -31,16 +67,37 @@ class ProductService:
         page_size: int = 20,
         sort_by: SortFields | None = None,
         descending: bool = False,
-    ) -> Tuple[List[ProductDTO], int]:
-        offset = (page - 1) * page_size
-        products = self.repo.get_all(
+        filters: ProductFilters | None = None,
+        after: ProductCursor | None = None,
+    ) -> ProductPageDTO:
+        # с курсором страница ищется по (ключ, id), OFFSET не используется
+        offset = 0 if after else (page - 1) * page_size
+        # лишняя строка отвечает на "есть ли следующая страница" без COUNT
+        items = self.reader.get_page(
             offset=offset,
-            limit=page_size,
+            limit=page_size + 1,
             sort_by=sort_by,
             descending=descending,
+            filters=filters,
+            after=(after.key, after.id) if after else None,
+        )
+        has_more = len(items) > page_size
+        items = items[:page_size]
+        total, count_mode = self.counter.count(filters)
+        next_cursor = None
+        if has_more:
+            next_cursor = encode_cursor(
+                cursor_after(items[-1], sort_by, descending)
+            )
+        return ProductPageDTO(
+            items=items,
+            page=page,
+            page_size=page_size,
+            total=total,
+            count_mode=count_mode,
+            has_more=has_more,
+            next_cursor=next_cursor,
         )
-        total = self.repo.count()
-        return [ProductDTO.from_entity(p) for p in products], total
 
     def set_price(self, product: ProductDM, new_price: float) -> Optional[ProductDM]:
         if new_price <= 0:
@@ -64,25 +121,35 @@ class ProductService:
     def is_available(self, product: ProductDM) -> bool:
         return (product.in_stock or 0) > 0
 
-    def restock(self, product: ProductDM, amount: int) -> ProductDM:
-        product.in_stock = (product.in_stock or 0) + amount
-        return self.repo.update(product)
-
-    def sell(self, product: ProductDM, amount: int = 1) -> ProductDM:
-        product.in_stock = (product.in_stock or 0) - amount
-        return self.repo.update(product)
-
-    def reserve(self, product: ProductDM, amount: int) -> bool:
-        current_stock = product.in_stock or 0
-        if current_stock >= amount:
-            product.in_stock = current_stock - amount
-            self.repo.update(product)
-            return True
-        return False
-
-    def release(self, product: ProductDM, amount: int) -> ProductDM:
-        product.in_stock = (product.in_stock or 0) + amount
-        return self.repo.update(product)
+    def restock(self, product_id: int, amount: int) -> int:
+        quantity = self.repo.increment_stock(product_id, amount)
+        if quantity is None:
+            raise ProductNotFoundError(product_id)
+        return quantity
+
+    def sell(self, product_id: int, amount: int = 1) -> int:
+        quantity = self.repo.decrement_stock(product_id, amount)
+        if quantity is None:
+            # различаем причины только на неуспешном пути
+            if not self.repo.exists(product_id):
+                raise ProductNotFoundError(product_id)
+            raise InsufficientStockError(product_id, amount)
+        return quantity
+
+    def reserve(self, product_id: int, amount: int) -> bool:
+        try:
+            self.sell(product_id, amount)
+        except InsufficientStockError:
+            return False
+        return True
+
+    def release(self, product_id: int, amount: int) -> int:
+        return self.restock(product_id, amount)
+
+    def set_stock(self, product_id: int, quantity: int) -> None:
+        if not self.repo.exists(product_id):
+            raise ProductNotFoundError(product_id)
+        self.repo.set_stock(product_id, quantity)
 
     def stock_status(self, product: ProductDM) -> str:
         if not product.in_stock or product.in_stock == 0:
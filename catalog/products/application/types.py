@@ -1,4 +1,41 @@
+from dataclasses import dataclass
 from typing import Literal
 
 SortFields = Literal["id", "name", "price"]
 SORT_FIELDS: tuple[str, ...] = ("id", "name", "price")
+
+LookupKind = Literal["brand", "category", "tag"]
+
+CountMode = Literal["exact", "cached", "estimate", "off"]
+COUNT_MODES: tuple[str, ...] = ("exact", "cached", "estimate", "off")
+
+
+@dataclass(frozen=True)
+class ProductFilters:
+    brand: str | None = None
+    category: str | None = None
+    tag: str | None = None
+
+
+# --- Суррогатные ключи кэша ответов ---
+LIST_TAG = "list:products"
+
+
+def product_tag(product_id: int) -> str:
+    return f"product:{product_id}"
+
+
+def lookup_tag(kind: LookupKind, name: str) -> str:
+    return f"{kind}:{name}"
+
+
+# --- События outbox ---
+PRODUCT_CREATED = "product.created"
+PRODUCT_UPDATED = "product.updated"
+PRODUCT_DELETED = "product.deleted"
+# склад не меняет состав и порядок списков, но меняет in_stock в их
+# элементах: страницы со старым остатком сбрасываются по тегу продукта
+PRODUCT_STOCK_CHANGED = "product.stock_changed"
+PRODUCT_TOPICS = frozenset(
+    {PRODUCT_CREATED, PRODUCT_UPDATED, PRODUCT_DELETED, PRODUCT_STOCK_CHANGED}
+)
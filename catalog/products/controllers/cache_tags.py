@@ -0,0 +1,52 @@
+from typing import Iterable, List, Optional
+
+import msgspec
+from django.http import HttpRequest
+
+from products.application.types import LIST_TAG, lookup_tag, product_tag
+from products.controllers.schemas import (
+    ProductBatchParams,
+    ValidationError,
+)
+
+
+# --- Разбор тела ответа: только поля, из которых строятся теги ---
+class _Item(msgspec.Struct):
+    id: int
+    brand: Optional[str] = None
+    categories: Optional[List[str]] = None
+
+
+class _Items(msgspec.Struct):
+    items: List[_Item]
+
+
+def _item_tags(item: _Item) -> Iterable[str]:
+    yield product_tag(item.id)
+    if item.brand:
+        yield lookup_tag("brand", item.brand)
+    for category in item.categories or ():
+        yield lookup_tag("category", category)
+
+
+def list_tags(request: HttpRequest, body: bytes) -> List[str]:
+    """Список зависит от состава каталога и от каждой показанной карточки."""
+    page = msgspec.json.decode(body, type=_Items)
+    return [LIST_TAG, *(t for item in page.items for t in _item_tags(item))]
+
+
+def detail_tags(request: HttpRequest, body: bytes) -> List[str]:
+    return list(_item_tags(msgspec.json.decode(body, type=_Item)))
+
+
+# --- Варианты ключа: нормализованные параметры запроса ---
+def batch_variant(request: HttpRequest) -> Optional[str]:
+    try:
+        params = ProductBatchParams.from_raw(request.GET.dict())
+    except ValidationError:
+        return None
+    return ",".join(map(str, params.ids))
+
+
+def path_variant(request: HttpRequest) -> Optional[str]:
+    return ""
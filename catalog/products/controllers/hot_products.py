@@ -0,0 +1,27 @@
+from functools import wraps
+from typing import Callable
+
+from django.http import HttpResponse
+from main.integrations import DishkaRequest
+
+from products.application.interfaces import HotProductsProtocol
+
+
+def track_product_access(
+    view: Callable[..., HttpResponse],
+) -> Callable[..., HttpResponse]:
+    """
+    Учитывает обращение к карточке в статистике для прогрева кэша.
+    Ставится снаружи cache_response, чтобы считались и попадания в кэш.
+    Считаются только найденные карточки: 404, в том числе из отрицательного
+    кэша, не должны попадать в прогрев.
+    """
+
+    @wraps(view)
+    def wrapper(request: DishkaRequest, *args, product_id: int, **kwargs):
+        response = view(request, *args, product_id=product_id, **kwargs)
+        if response.status_code in (200, 304):
+            request.container.get(HotProductsProtocol).record(product_id)
+        return response
+
+    return wrapper
@@ -4,7 +4,8 @@ from typing import Any, Dict, List, Optional
 
 from adaptix import Retort
 
-from products.application.types import SORT_FIELDS, SortFields
+from products.application.pagination import ProductCursor, decode_cursor
+from products.application.types import SORT_FIELDS, ProductFilters, SortFields
 from products.domain.entities import ProductDM
 
 retort = Retort()
@@ -28,6 +29,18 @@ class ProductQueryParams:
     page_size: int = 20
     sort_by: SortFields | None = None
     descending: bool = False
+    brand: Optional[str] = None
+    category: Optional[str] = None
+    tag: Optional[str] = None
+    cursor: Optional[str] = None
+
+    @property
+    def filters(self) -> ProductFilters:
+        return ProductFilters(brand=self.brand, category=self.category, tag=self.tag)
+
+    @property
+    def after(self) -> Optional[ProductCursor]:
+        return decode_cursor(self.cursor) if self.cursor else None
 
     @classmethod
     def from_raw(cls, raw: Dict[str, Any]) -> "ProductQueryParams":
@@ -50,17 +63,60 @@ class ProductQueryParams:
                 raise ValidationError.for_field(
                     "page_size", "Must be between 1 and 100"
                 )
+            # Нормализация фильтров так же, как при создании продукта
+            brand = str(raw.get("brand") or "").strip().title() or None
+            category = str(raw.get("category") or "").strip().lower() or None
+            tag = str(raw.get("tag") or "").strip().lower() or None
+            cursor = raw.get("cursor") or None
+            if cursor is not None:
+                try:
+                    after = decode_cursor(cursor)
+                except ValueError as e:
+                    raise ValidationError.for_field("cursor", str(e))
+                if (after.sort_by, after.descending) != (sort_by, val == "true"):
+                    raise ValidationError.for_field(
+                        "cursor", "Cursor does not match sort parameters"
+                    )
             normalized = {
                 "page": page,
                 "page_size": page_size,
                 "sort_by": sort_by,
                 "descending": val == "true",
+                "brand": brand,
+                "category": category,
+                "tag": tag,
+                "cursor": cursor,
             }
             return retort.load(normalized, cls)
         except (TypeError, ValueError) as e:
             raise ValidationError.for_field("params", str(e))
 
 
+# --- Batch get ---
+MAX_BATCH_IDS = 100
+
+
+@dataclass
+class ProductBatchParams:
+    ids: List[int]
+
+    @classmethod
+    def from_raw(cls, raw: Dict[str, Any]) -> "ProductBatchParams":
+        parts = [p.strip() for p in str(raw.get("ids") or "").split(",") if p.strip()]
+        if not parts:
+            raise ValidationError.for_field("ids", "Must not be empty")
+        try:
+            # дубликаты схлопываются, порядок первого вхождения сохраняется
+            ids = list(dict.fromkeys(int(p) for p in parts))
+        except ValueError:
+            raise ValidationError.for_field("ids", "Must be comma-separated integers")
+        if len(ids) > MAX_BATCH_IDS:
+            raise ValidationError.for_field(
+                "ids", f"At most {MAX_BATCH_IDS} ids per request"
+            )
+        return cls(ids=ids)
+
+
 # --- Create product ---
 @dataclass
 class ProductCreateSchema:
@@ -2,74 +2,121 @@ import msgspec
 from dishka import FromDishka
 from django.http import HttpResponse, JsonResponse
 from django.views.decorators.http import require_http_methods
+from main.infrastructure.conditional import (
+    not_modified,
+    public_cache_control,
+    with_validators,
+)
+from main.infrastructure.response_cache import cache_response
 from main.integrations import DishkaRequest, inject
 
+from products.application.errors import InsufficientStockError, ProductNotFoundError
 from products.application.interactors import (
     ApplyDiscountInteractor,
+    CachedGetProductInteractor,
+    CachedListProductsInteractor,
     CreateProductInteractor,
     DeleteProductInteractor,
     GetProductInteractor,
-    ListProductsInteractor,
+    GetProductsBatchInteractor,
+    GetProductVersionInteractor,
     RestockProductInteractor,
     SellProductInteractor,
     UpdateProductInteractor,
 )
+from products.controllers.cache_tags import (
+    batch_variant,
+    detail_tags,
+    list_tags,
+    path_variant,
+)
+from products.controllers.hot_products import track_product_access
 from products.controllers.schemas import (
+    ProductBatchParams,
     ProductCreateSchema,
     ProductQueryParams,
     ProductUpdateSchema,
+    RestockSchema,
+    SellSchema,
     ValidationError,
 )
 
 
 # --- LIST PRODUCTS ---
+# страницы кэширует только CachedListProductsInteractor: второй слой
+# в кэше ответов дублировал бы каждую запись
 @require_http_methods(["GET"])
+@public_cache_control
 @inject
 def products_view(
     request: DishkaRequest,
-    interactor: FromDishka[ListProductsInteractor],
+    interactor: FromDishka[CachedListProductsInteractor],
 ) -> HttpResponse:
     try:
-        params = ProductQueryParams.from_raw(dict(request.GET))
+        params = ProductQueryParams.from_raw(request.GET.dict())
     except ValidationError as e:
         return JsonResponse(
             {"error": "Invalid parameter", "field": e.field, "message": e.message},
             status=400,
         )
 
-    items, total = interactor.execute(
+    payload = interactor.execute(
         page=params.page,
         page_size=params.page_size,
         sort_by=params.sort_by,
         descending=params.descending,
+        filters=params.filters,
+        after=params.after,
     )
-
-    response = {
-        "total": total,
-        "page": params.page,
-        "page_size": params.page_size,
-        "items": items,
-    }
-    return HttpResponse(msgspec.json.encode(response), content_type="application/json")
+    return HttpResponse(payload, content_type="application/json")
 
 
 # --- GET PRODUCT BY ID ---
 @require_http_methods(["GET"])
+@public_cache_control
+@track_product_access
+@cache_response(tags=detail_tags, variant=path_variant)
 @inject
 def product_detail_view(
     request: DishkaRequest,
-    interactor: FromDishka[GetProductInteractor],
+    versions: FromDishka[GetProductVersionInteractor],
+    interactor: FromDishka[CachedGetProductInteractor],
     product_id: int,
 ) -> HttpResponse:
-    if product := interactor.execute(product_id):
-        return HttpResponse(
-            msgspec.json.encode(product), 
-            content_type="application/json"
-        )
+    if (current := versions.execute(product_id)) is None:
+        return JsonResponse({"error": "Product not found"}, status=404)
+    # ETag сильный: тело карточки однозначно задаётся версией строки
+    etag = f"{current.id}.{current.version}"
+    if (response := not_modified(request, etag, current.updated_at)) is not None:
+        return response
+    if payload := interactor.execute(product_id, current.version):
+        response = HttpResponse(payload, content_type="application/json")
+        return with_validators(response, etag, current.updated_at)
     else:
         return JsonResponse({"error": "Product not found"}, status=404)
 
 
+# --- GET PRODUCTS BY IDS ---
+@require_http_methods(["GET"])
+@public_cache_control
+@cache_response(tags=list_tags, variant=batch_variant)
+@inject
+def product_batch_view(
+    request: DishkaRequest,
+    interactor: FromDishka[GetProductsBatchInteractor],
+) -> HttpResponse:
+    try:
+        params = ProductBatchParams.from_raw(request.GET.dict())
+    except ValidationError as e:
+        return JsonResponse(
+            {"error": "Invalid parameter", "field": e.field, "message": e.message},
+            status=400,
+        )
+
+    result = interactor.execute(params.ids)
+    return HttpResponse(msgspec.json.encode(result), content_type="application/json")
+
+
 # --- CREATE PRODUCT ---
 @require_http_methods(["POST"])
 @inject
@@ -115,7 +162,7 @@ def product_update_view(
     if not product:
         return JsonResponse({"error": "Product not found"}, status=404)
 
-    updated = interactor.execute(params.apply(product))
+    updated = interactor.execute(params.apply(product), in_stock=params.in_stock)
     return HttpResponse(msgspec.json.encode(updated), content_type="application/json")
 
 
@@ -162,15 +209,15 @@ def product_restock_view(
     product_id: int,
 ) -> HttpResponse:
     try:
-        data = msgspec.json.decode(request.body)
-        amount = data.get("amount", 0)
-    except Exception:
+        params = RestockSchema.from_raw(msgspec.json.decode(request.body))
+    except (msgspec.DecodeError, ValidationError):
         return JsonResponse({"error": "Invalid data"}, status=400)
-    product = interactor.service.get_product(product_id)
-    if not product:
+
+    try:
+        stock = interactor.execute(product_id, params.amount)
+    except ProductNotFoundError:
         return JsonResponse({"error": "Product not found"}, status=404)
-    updated = interactor.execute(product, amount)
-    return HttpResponse(msgspec.json.encode(updated), content_type="application/json")
+    return HttpResponse(msgspec.json.encode(stock), content_type="application/json")
 
 
 # --- SELL PRODUCT ---
@@ -182,14 +229,17 @@ def product_sell_view(
     product_id: int,
 ) -> HttpResponse:
     try:
-        data = msgspec.json.decode(request.body)
-        amount = data.get("amount", 1)
-    except Exception:
+        params = SellSchema.from_raw(msgspec.json.decode(request.body or b"{}"))
+    except (msgspec.DecodeError, ValidationError):
         return JsonResponse({"error": "Invalid data"}, status=400)
 
-    product = interactor.service.get_product(product_id)
-    if not product:
+    try:
+        stock = interactor.execute(product_id, params.amount)
+    except ProductNotFoundError:
         return JsonResponse({"error": "Product not found"}, status=404)
-
-    updated = interactor.execute(product, amount)
-    return HttpResponse(msgspec.json.encode(updated), content_type="application/json")
+    except InsufficientStockError:
+        return JsonResponse(
+            {"error": "Insufficient stock", "requested": params.amount},
+            status=409,
+        )
+    return HttpResponse(msgspec.json.encode(stock), content_type="application/json")
@@ -0,0 +1,135 @@
+from typing import Optional, Tuple, cast
+
+import msgspec
+from main.application.interfaces import SessionProtocol
+from redis import Redis
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..application.interfaces import (
+    ProductCountCacheProtocol,
+    ProductCounterProtocol,
+    ProductRepositoryProtocol,
+)
+from ..application.types import CountMode, ProductFilters
+
+COUNT_CACHE_KEY = "products:count"
+
+
+def _filters_field(filters: Optional[ProductFilters]) -> str:
+    f = filters or ProductFilters()
+    return msgspec.json.encode((f.brand, f.category, f.tag)).decode()
+
+
+class RedisProductCountCache(ProductCountCacheProtocol):
+    """
+    Все варианты фильтров лежат в одном hash, поэтому сброс — один DEL.
+    TTL ставится на hash при первой записи после сброса.
+    """
+
+    def __init__(self, redis: Redis, ttl: int) -> None:
+        self._redis = redis
+        self._ttl = ttl
+
+    def get(self, filters: Optional[ProductFilters] = None) -> Optional[int]:
+        cached = cast(
+            Optional[bytes], self._redis.hget(COUNT_CACHE_KEY, _filters_field(filters))
+        )
+        return None if cached is None else int(cached)
+
+    def set(self, filters: Optional[ProductFilters], total: int) -> None:
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.hset(COUNT_CACHE_KEY, _filters_field(filters), str(total))
+        pipe.expire(COUNT_CACHE_KEY, self._ttl, nx=True)
+        pipe.execute()
+
+    def invalidate(self) -> None:
+        self._redis.delete(COUNT_CACHE_KEY)
+
+
+class ExactProductCounter(ProductCounterProtocol):
+    """Точный COUNT(*) на каждый запрос."""
+
+    def __init__(self, repo: ProductRepositoryProtocol) -> None:
+        self._repo = repo
+
+    def count(
+        self, filters: Optional[ProductFilters] = None
+    ) -> Tuple[Optional[int], CountMode]:
+        return self._repo.count(filters), "exact"
+
+    def invalidate(self) -> None:
+        pass
+
+
+class CachedProductCounter(ProductCounterProtocol):
+    """
+    COUNT(*) с кэшем в Redis. Сброс после create/delete делает сам
+    счётчик; после update (смена бренда или категорий меняет
+    отфильтрованные счётчики) — обработчик outbox.
+    """
+
+    def __init__(
+        self,
+        repo: ProductRepositoryProtocol,
+        cache: ProductCountCacheProtocol,
+        uow: SessionProtocol,
+    ) -> None:
+        self._repo = repo
+        self._cache = cache
+        self._uow = uow
+
+    def count(
+        self, filters: Optional[ProductFilters] = None
+    ) -> Tuple[Optional[int], CountMode]:
+        if (cached := self._cache.get(filters)) is not None:
+            return cached, "cached"
+        total = self._repo.count(filters)
+        self._cache.set(filters, total)
+        # промах посчитан точным COUNT — так и сообщаем
+        return total, "exact"
+
+    def invalidate(self) -> None:
+        # сбрасываем после коммита, иначе параллельный запрос закэширует старое
+        self._uow.on_commit(self._cache.invalidate)
+
+
+class EstimatedProductCounter(ProductCounterProtocol):
+    """
+    Оценка планировщика из pg_class.reltuples. Для запросов с фильтрами
+    оценки нет, и подсчёт откатывается на точный.
+    """
+
+    def __init__(self, repo: ProductRepositoryProtocol, session: Session) -> None:
+        self._repo = repo
+        self._session = session
+
+    def count(
+        self, filters: Optional[ProductFilters] = None
+    ) -> Tuple[Optional[int], CountMode]:
+        if filters is None or filters == ProductFilters():
+            estimate = self._session.scalar(
+                text(
+                    "SELECT reltuples::bigint FROM pg_class "
+                    "WHERE oid = 'products'::regclass"
+                )
+            )
+            # -1: таблица ещё ни разу не анализировалась
+            if estimate is not None and estimate >= 0:
+                return int(estimate), "estimate"
+        return self._repo.count(filters), "exact"
+
+    def invalidate(self) -> None:
+        pass
+
+
+class DisabledProductCounter(ProductCounterProtocol):
+    """total не считается, клиент ориентируется на has_more."""
+
+    def count(
+        self, filters: Optional[ProductFilters] = None
+    ) -> Tuple[Optional[int], CountMode]:
+        return None, "off"
+
+    def invalidate(self) -> None:
+        pass
@@ -0,0 +1,38 @@
+from typing import Iterable, Optional, Tuple
+
+from ..application.interfaces import ProductCache, ProductDetailCacheProtocol
+
+
+def _key(product_id: int, version: int) -> str:
+    return f"{product_id}:{version}"
+
+
+class ProductDetailCache(ProductDetailCacheProtocol):
+    """
+    Карточка продукта уже закодированной в JSON: байты отдаются
+    в HttpResponse как есть, без decode/encode. Хранится в двухуровневом
+    ProductCache под ключом <id>:<version>, так что горячие SKU читаются
+    из памяти процесса, а тело всегда соответствует отданному ETag.
+    """
+
+    def __init__(self, store: ProductCache) -> None:
+        self._store = store
+
+    def get(self, product_id: int, version: int) -> Optional[bytes]:
+        return self._store.get(_key(product_id, version))
+
+    def set(self, product_id: int, version: int, payload: bytes) -> None:
+        self._store.set(_key(product_id, version), payload)
+
+    def get_many(
+        self, keys: Iterable[Tuple[int, int]]
+    ) -> dict[Tuple[int, int], bytes]:
+        by_key = {_key(*key): key for key in keys}
+        found = self._store.get_many(by_key)
+        return {by_key[key]: payload for key, payload in found.items()}
+
+    def set_many(self, payloads: dict[Tuple[int, int], bytes]) -> None:
+        self._store.set_many({_key(*key): p for key, p in payloads.items()})
+
+    def stats(self) -> dict[str, int]:
+        return self._store.stats()
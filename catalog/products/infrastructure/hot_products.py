@@ -0,0 +1,43 @@
+import random
+import time
+from typing import List, cast
+
+from redis import Redis
+
+from ..application.interfaces import HotProductsProtocol
+
+HOT_KEY = "stats:hot:products:{}"
+
+
+class RedisHotProducts(HotProductsProtocol):
+    """
+    Счётчики обращений к карточкам в почасовых ZSET. Пишется только
+    sample_rate обращений, так что горячий путь почти никогда не ходит
+    в Redis; для ранжирования выборки этого достаточно. Часы старше
+    окна удаляются по TTL сами.
+    """
+
+    def __init__(self, redis: Redis, sample_rate: float, window_hours: int) -> None:
+        self._redis = redis
+        self._sample_rate = sample_rate
+        self._window_hours = window_hours
+
+    def record(self, product_id: int) -> None:
+        if random.random() >= self._sample_rate:
+            return
+        key = HOT_KEY.format(int(time.time()) // 3600)
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.zincrby(key, 1, product_id)
+        pipe.expire(key, (self._window_hours + 1) * 3600)
+        pipe.execute()
+
+    def top(self, limit: int) -> List[int]:
+        hour = int(time.time()) // 3600
+        hours = [HOT_KEY.format(hour - i) for i in range(self._window_hours)]
+        union = HOT_KEY.format("top")
+        pipe = self._redis.pipeline()
+        pipe.zunionstore(union, hours)
+        pipe.zrevrange(union, 0, limit - 1)
+        pipe.delete(union)
+        ids = cast(list[bytes], pipe.execute()[1])
+        return [int(i) for i in ids]
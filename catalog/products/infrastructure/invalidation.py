@@ -0,0 +1,60 @@
+from main.application.interfaces import OutboxHandlerProtocol, ResponseCacheProtocol
+from main.domain.entities import OutboxEvent
+
+from ..application.interfaces import (
+    MissingProductsCacheProtocol,
+    ProductCountCacheProtocol,
+    ProductListCache,
+)
+from ..application.types import (
+    LIST_TAG,
+    PRODUCT_CREATED,
+    PRODUCT_STOCK_CHANGED,
+    PRODUCT_TOPICS,
+    PRODUCT_UPDATED,
+    product_tag,
+)
+
+
+class ProductCacheInvalidator(OutboxHandlerProtocol):
+    """
+    Обработчик событий продуктов из outbox: сбрасывает страницы списков,
+    HTTP-ответы, отрицательный кэш и кэш счётчиков. Карточке сброс не нужен — её ключ
+    включает версию строки. Все операции идемпотентны, так что повторная
+    доставка пачки безопасна.
+    """
+
+    topics = PRODUCT_TOPICS
+
+    def __init__(
+        self,
+        pages: ProductListCache,
+        responses: ResponseCacheProtocol,
+        missing: MissingProductsCacheProtocol,
+        counts: ProductCountCacheProtocol,
+    ) -> None:
+        self.pages = pages
+        self.responses = responses
+        self.missing = missing
+        self.counts = counts
+
+    def handle(self, events: list[OutboxEvent]) -> None:
+        ids = {int(event.key) for event in events}
+        tags = [product_tag(product_id) for product_id in ids]
+        # элементы списков несут in_stock, так что страницы устаревают
+        # от любого события; без этого сброшенные по тегу продукта ответы
+        # тут же собрались бы заново из ещё свежей страницы
+        self.pages.expire_all()
+        # всё, кроме склада, может поменять ещё и состав или порядок
+        # списков — тогда сбрасываются все списковые ответы, а не только
+        # те, где есть сам продукт
+        if any(event.topic != PRODUCT_STOCK_CHANGED for event in events):
+            tags.append(LIST_TAG)
+        for event in events:
+            if event.topic == PRODUCT_CREATED:
+                # id мог попасть в отрицательный кэш, пока строки ещё не было
+                self.missing.forget(int(event.key))
+        self.responses.purge(tags)
+        # бренд и категории могли смениться — отфильтрованные счётчики устарели
+        if any(event.topic == PRODUCT_UPDATED for event in events):
+            self.counts.invalidate()
@@ -0,0 +1,80 @@
+from collections import defaultdict
+from itertools import chain
+from typing import Callable, Iterable, Optional
+
+from main.application.interfaces import CacheProtocol
+from sqlalchemy import event
+from sqlalchemy.orm import Session, UOWTransaction, sessionmaker
+from sqlalchemy.orm.attributes import get_history
+
+from products.application.types import LookupKind
+from products.infrastructure.models import Brand, Category, Tag
+
+LOOKUP_MODELS: dict[LookupKind, type[Brand] | type[Category] | type[Tag]] = {
+    "brand": Brand,
+    "category": Category,
+    "tag": Tag,
+}
+_KIND_BY_MODEL = {model: kind for kind, model in LOOKUP_MODELS.items()}
+
+
+_PENDING_KEY = "lookup_cache_pending"
+
+
+class LookupCache:
+    """
+    Кэш name → id для справочников brands, categories и tags поверх
+    двухуровневых кэшей (память процесса + Redis), общих для всех воркеров.
+    Хранит только id строк, которые гарантированно существуют в БД.
+    """
+
+    def __init__(
+        self,
+        stores: dict[LookupKind, CacheProtocol],
+        on_rename: Optional[Callable[[LookupKind, set[str]], None]] = None,
+    ) -> None:
+        self._stores = stores
+        self._on_rename = on_rename
+
+    def get_many(self, kind: LookupKind, names: Iterable[str]) -> dict[str, int]:
+        found = self._stores[kind].get_many(names)
+        return {name: int(raw) for name, raw in found.items()}
+
+    def put_many(self, kind: LookupKind, ids: dict[str, int]) -> None:
+        self._stores[kind].set_many({n: str(id).encode() for n, id in ids.items()})
+
+    def invalidate(self, kind: LookupKind, names: Iterable[str]) -> None:
+        self._stores[kind].invalidate(names)
+
+    def track_renames(self, session_maker: sessionmaker[Session]) -> None:
+        """
+        Сбрасывает записи при переименовании или удалении строк через ORM.
+        Имена копятся с каждого flush и рассылаются после коммита, чтобы
+        другие воркеры не успели перечитать ещё не закоммиченную строку.
+        """
+        event.listen(session_maker, "after_flush", self._after_flush)
+        event.listen(session_maker, "after_commit", self._after_commit)
+        event.listen(session_maker, "after_rollback", self._after_rollback)
+
+    def _after_flush(self, session: Session, flush_context: UOWTransaction) -> None:
+        pending = session.info.setdefault(_PENDING_KEY, defaultdict(set))
+        for obj in session.dirty:
+            if (kind := _KIND_BY_MODEL.get(type(obj))) is None:
+                continue
+            history = get_history(obj, "name")
+            # flush без смены имени (правка других полей) — не переименование
+            if not history.has_changes():
+                continue
+            pending[kind].update(chain(history.deleted, history.added))
+        for obj in session.deleted:
+            if (kind := _KIND_BY_MODEL.get(type(obj))) is not None:
+                pending[kind].update(get_history(obj, "name").sum())
+
+    def _after_commit(self, session: Session) -> None:
+        for kind, names in session.info.pop(_PENDING_KEY, {}).items():
+            self.invalidate(kind, names)
+            if self._on_rename is not None:
+                self._on_rename(kind, names)
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(_PENDING_KEY, None)
@@ -7,9 +7,11 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Table,
+    func,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -23,26 +25,54 @@ class ProductModel(Base):
     description: Mapped[str | None] = mapped_column(String, nullable=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
 
+    # Денормализованная актуальная цена (последняя запись из prices)
+    current_price: Mapped[float | None] = mapped_column(Float, nullable=True)
+    current_currency: Mapped[str | None] = mapped_column(String, nullable=True)
+
+    # Версия представления продукта для ETag/Last-Modified: поднимается при
+    # любой записи, меняющей карточку (включая склад и переименование бренда)
+    version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default="1"
+    )
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
     brand_id: Mapped[int] = mapped_column(ForeignKey("brands.id"))
     brand = relationship("Brand", back_populates="products")
 
     categories = relationship(
         "Category", secondary="product_categories", back_populates="products"
     )
-    attributes = relationship("ProductAttribute", back_populates="product")
-    prices = relationship("Price", back_populates="product")
-    inventory = relationship("Inventory", back_populates="product")
-    reviews = relationship("Review", back_populates="product")
-    variants = relationship("Variant", back_populates="product")
+    # дочерние строки удаляет ON DELETE CASCADE в самой БД, ORM их не
+    # подгружает и не обнуляет им product_id
+    attributes = relationship(
+        "ProductAttribute", back_populates="product", passive_deletes=True
+    )
+    prices = relationship("Price", back_populates="product", passive_deletes=True)
+    inventory = relationship(
+        "Inventory",
+        back_populates="product",
+        order_by="Inventory.id",
+        passive_deletes=True,
+    )
+    reviews = relationship("Review", back_populates="product", passive_deletes=True)
+    variants = relationship("Variant", back_populates="product", passive_deletes=True)
     tags = relationship("Tag", secondary="product_tags", back_populates="products")
-    media = relationship("Media", back_populates="product")
+    media = relationship("Media", back_populates="product", passive_deletes=True)
+
+    # Составные индексы под keyset-пагинацию: WHERE (key, id) > (...) ORDER BY key, id
+    __table_args__ = (
+        Index("ix_products_name_id", "name", "id"),
+        Index("ix_products_current_price_id", "current_price", "id"),
+    )
 
 
 class Category(Base):
     __tablename__ = "categories"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    name: Mapped[str] = mapped_column(String, nullable=False)
+    name: Mapped[str] = mapped_column(String, nullable=False, unique=True, index=True)
     description: Mapped[str] = mapped_column(String, nullable=True)
     parent_category_id: Mapped[int] = mapped_column(
         ForeignKey("categories.id"), nullable=True
@@ -57,7 +87,11 @@ class Category(Base):
 product_categories = Table(
     "product_categories",
     Base.metadata,
-    Column("product_id", ForeignKey("products.id"), primary_key=True),
+    Column(
+        "product_id",
+        ForeignKey("products.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
     Column("category_id", ForeignKey("categories.id"), primary_key=True),
 )
 
@@ -67,7 +101,7 @@ class Brand(Base):
     __tablename__ = "brands"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    name: Mapped[str] = mapped_column(String, nullable=False)
+    name: Mapped[str] = mapped_column(String, nullable=False, unique=True, index=True)
     country: Mapped[str] = mapped_column(String, nullable=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
 
@@ -79,7 +113,9 @@ class ProductAttribute(Base):
     __tablename__ = "product_attributes"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"))
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id", ondelete="CASCADE")
+    )
     key: Mapped[str] = mapped_column(String, nullable=False)
     value: Mapped[str] = mapped_column(String, nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
@@ -92,7 +128,9 @@ class Price(Base):
     __tablename__ = "prices"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"))
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id", ondelete="CASCADE")
+    )
     price: Mapped[float] = mapped_column(Float, nullable=True)
     currency: Mapped[str] = mapped_column(String, default="USD", nullable=True)
     valid_from: Mapped[datetime.datetime] = mapped_column(
@@ -108,7 +146,9 @@ class Inventory(Base):
     __tablename__ = "inventory"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"))
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id", ondelete="CASCADE")
+    )
     quantity: Mapped[int] = mapped_column(Integer, default=0)
     warehouse_id: Mapped[int] = mapped_column(Integer, nullable=True)
 
@@ -120,7 +160,11 @@ class Review(Base):
     __tablename__ = "reviews"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"))
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id", ondelete="CASCADE")
+    )
+    # без внешнего ключа и другого типа, чем users.user_id, поэтому
+    # связи с User в ORM нет: с ней не настраивался ни один маппер
     user_id: Mapped[int] = mapped_column(Integer, nullable=False)
     rating: Mapped[int] = mapped_column(Integer, nullable=False)
     comment: Mapped[str] = mapped_column(String, nullable=True)
@@ -131,7 +175,6 @@ class Review(Base):
 
     product = relationship("ProductModel", back_populates="reviews")
     media = relationship("Media", back_populates="review", cascade="all, delete-orphan")
-    user = relationship("User", back_populates="reviews")
 
 
 # --- Теги ---
@@ -148,7 +191,11 @@ class Tag(Base):
 product_tags = Table(
     "product_tags",
     Base.metadata,
-    Column("product_id", ForeignKey("products.id"), primary_key=True),
+    Column(
+        "product_id",
+        ForeignKey("products.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
     Column("tag_id", ForeignKey("tags.id"), primary_key=True),
 )
 
@@ -158,7 +205,9 @@ class Variant(Base):
     __tablename__ = "variants"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"))
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id", ondelete="CASCADE")
+    )
     sku: Mapped[str] = mapped_column(String, nullable=False)
     size: Mapped[str] = mapped_column(String, nullable=True)
     color: Mapped[str] = mapped_column(String, nullable=True)
@@ -173,7 +222,7 @@ class Media(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
     product_id: Mapped[int | None] = mapped_column(
-        ForeignKey("products.id"), nullable=True
+        ForeignKey("products.id", ondelete="CASCADE"), nullable=True
     )
     review_id: Mapped[int | None] = mapped_column(
         ForeignKey("reviews.id"), nullable=True
@@ -0,0 +1,43 @@
+from redis import Redis
+
+from ..application.interfaces import MissingProductsCacheProtocol
+
+MISSING_KEY = "products:missing:{}"
+# 2^16 id на ключ: битмап диапазона занимает не больше 8 КБ
+RANGE_BITS = 16
+_OFFSET_MASK = (1 << RANGE_BITS) - 1
+
+
+class RedisMissingProductsCache(MissingProductsCacheProtocol):
+    """
+    Отрицательный кэш "продукта с таким id нет": один бит на id в битмапе
+    диапазона. Перебор миллионов несуществующих id стоит килобайты,
+    а не ключ на каждый id. TTL ставится на весь диапазон при первой
+    отметке, поэтому бит живёт не дольше ttl.
+    """
+
+    def __init__(self, redis: Redis, ttl: int) -> None:
+        self._redis = redis
+        self._ttl = ttl
+
+    @staticmethod
+    def _locate(product_id: int) -> tuple[str, int]:
+        return (
+            MISSING_KEY.format(product_id >> RANGE_BITS),
+            product_id & _OFFSET_MASK,
+        )
+
+    def is_missing(self, product_id: int) -> bool:
+        key, offset = self._locate(product_id)
+        return bool(self._redis.getbit(key, offset))
+
+    def mark_missing(self, product_id: int) -> None:
+        key, offset = self._locate(product_id)
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.setbit(key, offset, 1)
+        pipe.expire(key, self._ttl, nx=True)
+        pipe.execute()
+
+    def forget(self, product_id: int) -> None:
+        key, offset = self._locate(product_id)
+        self._redis.setbit(key, offset, 0)
@@ -0,0 +1,140 @@
+from typing import Callable, Iterable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import ColumnElement, Select, UnaryExpression, and_, select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+from products.infrastructure.lookups import LOOKUP_MODELS, LookupCache
+from products.infrastructure.models import (
+    ProductModel,
+    product_categories,
+    product_tags,
+)
+
+from ..application.pagination import CursorKey
+from ..application.types import LookupKind, ProductFilters, SortFields
+
+T = TypeVar("T")
+
+SORT_COLUMNS: dict[SortFields, InstrumentedAttribute] = {
+    "id": ProductModel.id,
+    "name": ProductModel.name,
+    "price": ProductModel.current_price,
+}
+
+
+# --- Сортировка ---
+def order_by(
+    sort_by: SortFields, descending: bool
+) -> List[InstrumentedAttribute | UnaryExpression]:
+    """ORDER BY ключ, id — id добавляется как тай-брейкер для keyset."""
+    columns = [SORT_COLUMNS[sort_by]]
+    if sort_by != "id":
+        columns.append(ProductModel.id)
+    return [c.desc() if descending else c for c in columns]
+
+
+# --- Keyset-пагинация ---
+def seek(
+    sort_by: SortFields,
+    descending: bool,
+    key: CursorKey,
+    last_id: int,
+) -> List[ColumnElement[bool]]:
+    """
+    Предикаты WHERE (key, id) > (...) для продолжения после курсора.
+    Порядок NULL совпадает с умолчаниями Postgres (ASC NULLS LAST,
+    DESC NULLS FIRST), поэтому оба направления читаются btree-индексом
+    (column, id). Для цены возвращается до двух сегментов: переход через
+    границу NULL/не-NULL добирается вторым запросом вместо OR, который
+    превратил бы Index Cond в Filter.
+    """
+    pk = ProductModel.id
+    id_after = pk < last_id if descending else pk > last_id
+    if sort_by == "id":
+        return [id_after]
+    column = SORT_COLUMNS[sort_by]
+    row = tuple_(column, pk)
+    row_after = row < (key, last_id) if descending else row > (key, last_id)
+    if sort_by != "price":
+        return [row_after]
+    if key is None:
+        null_tail = and_(column.is_(None), id_after)
+        return [null_tail, column.is_not(None)] if descending else [null_tail]
+    return [row_after] if descending else [row_after, column.is_(None)]
+
+
+def fetch_page(
+    fetch: Callable[[Select], Iterable[T]],
+    stmt: Select,
+    sort_by: SortFields,
+    descending: bool,
+    offset: int,
+    limit: int,
+    after: Optional[Tuple[CursorKey, int]],
+) -> List[T]:
+    """
+    Страница stmt в порядке order_by: по offset либо после курсора.
+    Сегменты seek выполняются по очереди, пока страница не наберётся.
+    """
+    stmt = stmt.order_by(*order_by(sort_by, descending))
+    if after is None:
+        return list(fetch(stmt.offset(offset).limit(limit)))
+    items: List[T] = []
+    for predicate in seek(sort_by, descending, *after):
+        items += fetch(stmt.where(predicate).limit(limit - len(items)))
+        if len(items) == limit:
+            break
+    return items
+
+
+# --- Фильтры ---
+def lookup_id(
+    session: Session, lookups: LookupCache, kind: LookupKind, name: str
+) -> Optional[int]:
+    if cached := lookups.get_many(kind, [name]):
+        return cached[name]
+    model = LOOKUP_MODELS[kind]
+    found = session.scalar(select(model.id).where(model.name == name))
+    if found is not None:
+        lookups.put_many(kind, {name: found})
+    return found
+
+
+def filter_predicates(
+    session: Session,
+    lookups: LookupCache,
+    filters: Optional[ProductFilters],
+) -> Optional[List[ColumnElement[bool]]]:
+    """
+    Условия WHERE по бренду/категории/тегу через их id.
+    None означает, что какого-то из имён нет и результат заведомо пуст.
+    """
+    predicates: List[ColumnElement[bool]] = []
+    if filters is None:
+        return predicates
+    if filters.brand is not None:
+        if (brand_id := lookup_id(session, lookups, "brand", filters.brand)) is None:
+            return None
+        predicates.append(ProductModel.brand_id == brand_id)
+    if filters.category is not None:
+        category_id = lookup_id(session, lookups, "category", filters.category)
+        if category_id is None:
+            return None
+        predicates.append(
+            ProductModel.id.in_(
+                select(product_categories.c.product_id).where(
+                    product_categories.c.category_id == category_id
+                )
+            )
+        )
+    if filters.tag is not None:
+        if (tag_id := lookup_id(session, lookups, "tag", filters.tag)) is None:
+            return None
+        predicates.append(
+            ProductModel.id.in_(
+                select(product_tags.c.product_id).where(
+                    product_tags.c.tag_id == tag_id
+                )
+            )
+        )
+    return predicates
@@ -0,0 +1,128 @@
+from typing import List, Optional, Tuple
+
+from sqlalchemy import ARRAY, Select, String, func, select
+from sqlalchemy.orm import Session
+
+from products.infrastructure.lookups import LookupCache
+from products.infrastructure.models import (
+    Brand,
+    Category,
+    Inventory,
+    Media,
+    ProductModel,
+    product_categories,
+)
+from products.infrastructure.queries import fetch_page, filter_predicates
+
+from ..application.dto import ProductDTO, ProductVersionDTO
+from ..application.interfaces import ProductReaderProtocol
+from ..application.pagination import CursorKey
+from ..application.types import ProductFilters, SortFields
+
+
+def _projection() -> Select:
+    """
+    Колонки строго в порядке полей ProductDTO, чтобы строка раскладывалась
+    в структуру позиционно. Коллекции собираются коррелированными
+    ARRAY(SELECT ...) — без GROUP BY и без размножения строк джойнами,
+    так что LIMIT и keyset-предикаты работают по products как есть.
+    """
+    pk = ProductModel.id
+    categories = (
+        select(Category.name)
+        .join(product_categories, product_categories.c.category_id == Category.id)
+        .where(product_categories.c.product_id == pk)
+        .order_by(Category.id)
+        .scalar_subquery()
+    )
+    in_stock = (
+        select(Inventory.quantity)
+        .where(Inventory.product_id == pk)
+        .order_by(Inventory.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    media = (
+        select(Media.url)
+        .where(Media.product_id == pk)
+        .order_by(Media.id)
+        .scalar_subquery()
+    )
+    return select(
+        pk,
+        ProductModel.name,
+        ProductModel.current_price,
+        ProductModel.description,
+        Brand.name,
+        func.array(categories, type_=ARRAY(String)),
+        in_stock,
+        func.array(media, type_=ARRAY(String)),
+        func.coalesce(ProductModel.current_currency, "USD"),
+    ).outerjoin(Brand, Brand.id == ProductModel.brand_id)
+
+
+_PROJECTION = _projection()
+_VERSIONS = select(ProductModel.id, ProductModel.version, ProductModel.updated_at)
+
+
+class ProductReader(ProductReaderProtocol):
+    """
+    Read-only путь для отдачи продуктов наружу: Core select() только нужных
+    колонок, строки сразу превращаются в ProductDTO. ORM-модели, identity map
+    и ProductDM на этом пути не создаются.
+    """
+
+    def __init__(self, session: Session, lookups: LookupCache) -> None:
+        self.session = session
+        self.lookups = lookups
+
+    def get_by_id(self, product_id: int) -> Optional[ProductDTO]:
+        row = self.session.execute(
+            _PROJECTION.where(ProductModel.id == product_id)
+        ).first()
+        return None if row is None else ProductDTO(*row)
+
+    def get_version(self, product_id: int) -> Optional[ProductVersionDTO]:
+        """Только валидаторы — поиск по PK без подзапросов проекции."""
+        row = self.session.execute(
+            _VERSIONS.where(ProductModel.id == product_id)
+        ).first()
+        return None if row is None else ProductVersionDTO(*row)
+
+    def get_many(self, product_ids: List[int]) -> List[ProductDTO]:
+        if not product_ids:
+            return []
+        return self._fetch(_PROJECTION.where(ProductModel.id.in_(product_ids)))
+
+    def get_versions(self, product_ids: List[int]) -> List[ProductVersionDTO]:
+        if not product_ids:
+            return []
+        rows = self.session.execute(
+            _VERSIONS.where(ProductModel.id.in_(product_ids))
+        )
+        return [ProductVersionDTO(*row) for row in rows]
+
+    def get_page(
+        self,
+        offset: int = 0,
+        limit: int = 20,
+        sort_by: Optional[SortFields] = None,
+        descending: bool = False,
+        filters: Optional[ProductFilters] = None,
+        after: Optional[Tuple[CursorKey, int]] = None,
+    ) -> List[ProductDTO]:
+        predicates = filter_predicates(self.session, self.lookups, filters)
+        if predicates is None:
+            return []
+        return fetch_page(
+            self._fetch,
+            _PROJECTION.where(*predicates),
+            sort_by or "id",
+            descending,
+            offset,
+            limit,
+            after,
+        )
+
+    def _fetch(self, stmt: Select) -> List[ProductDTO]:
+        return [ProductDTO(*row) for row in self.session.execute(stmt)]
@@ -1,17 +1,56 @@
-from typing import List, Optional
+from functools import partial
+from typing import List, Optional, Tuple
 
-from sqlalchemy import desc
-from sqlalchemy.orm import Session
+from main.application.interfaces import OutboxProtocol, SessionProtocol
+from sqlalchemy import ScalarSelect, Update, delete, exists, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Query, Session, joinedload, selectinload
 
-from products.infrastructure.models import Brand, Category, Media, Price, ProductModel
+from products.infrastructure.lookups import LOOKUP_MODELS, LookupCache
+from products.infrastructure.models import (
+    Inventory,
+    Media,
+    Price,
+    ProductModel,
+    product_categories,
+)
+from products.infrastructure.queries import fetch_page, filter_predicates
+from products.infrastructure.versions import touch
 
 from ..application.interfaces import ProductRepositoryProtocol, SortFields
+from ..application.pagination import CursorKey
+from ..application.types import (
+    PRODUCT_CREATED,
+    PRODUCT_DELETED,
+    PRODUCT_STOCK_CHANGED,
+    PRODUCT_UPDATED,
+    LookupKind,
+    ProductFilters,
+)
 from ..domain.entities import ProductDM
 
+# Бренд подтягивается JOIN-ом, коллекции — отдельным SELECT ... IN
+# на всю страницу, поэтому число запросов не зависит от её размера.
+_RELATIONS = (
+    joinedload(ProductModel.brand),
+    selectinload(ProductModel.categories),
+    selectinload(ProductModel.inventory),
+    selectinload(ProductModel.media),
+)
+
 
 class ProductRepository(ProductRepositoryProtocol):
-    def __init__(self, session: Session) -> None:
+    def __init__(
+        self,
+        session: Session,
+        uow: SessionProtocol,
+        lookups: LookupCache,
+        outbox: OutboxProtocol,
+    ) -> None:
         self.session = session
+        self.uow = uow
+        self.lookups = lookups
+        self.outbox = outbox
 
     # --- CREATE ---
     def add(self, product: ProductDM) -> ProductDM:
@@ -20,26 +59,35 @@ class ProductRepository(ProductRepositoryProtocol):
             description=product.description,
             is_active=True,
         )
-        self.session.add(model)
-        self.session.commit()
-
-        if product.price is not None:
-            self._add_price(model.id, product.price, product.currency)
-
         if product.brand:
-            self._ensure_brand(product, model)
+            model.brand_id = self._ensure_brand(product.brand)
+        if product.price is not None:
+            self._add_price(model, product.price, product.currency)
+        self.session.add(model)
+        self.session.add(Inventory(product=model, quantity=product.in_stock or 0))
+        self.uow.flush()
 
         if product.categories:
-            self._ensure_categories(product, model)
+            category_ids = self._ensure_categories(product.categories)
+            self._link_categories(model.id, category_ids)
 
         if product.media_urls:
-            self._ensure_media(product, model)
+            self._insert_media(model.id, product.media_urls)
 
-        return self._to_entity(model)
+        self.uow.flush()
+        self._publish(PRODUCT_CREATED, model.id)
+        return self._reload(model.id)
 
     # --- READ ---
+    # не кэшируется: результат идёт в read-modify-write через update, и
+    # копия из кэша записала бы старые поля поверх новых; отдачу наружу
+    # кэшируют карточки по версии и страницы списков
     def get_by_id(self, product_id: int) -> Optional[ProductDM]:
-        row = self.session.query(ProductModel).filter_by(id=product_id).first()
+        row = (
+            self._with_relations(self.session.query(ProductModel))
+            .filter_by(id=product_id)
+            .first()
+        )
         return None if row is None else self._to_entity(row)
 
     def get_all(
@@ -48,18 +96,28 @@ class ProductRepository(ProductRepositoryProtocol):
         limit: int = 20,
         sort_by: Optional[SortFields] = None,
         descending: bool = False,
+        filters: Optional[ProductFilters] = None,
+        after: Optional[Tuple[CursorKey, int]] = None,
     ) -> List[ProductDM]:
-        query = self.session.query(ProductModel)
-        if sort_by is not None:
-            column = getattr(ProductModel, sort_by)
-            if descending:
-                column = column.desc()
-            query = query.order_by(column)
-        rows = query.offset(offset).limit(limit).all()
-        return [self._to_entity(r) for r in rows]
-
-    def count(self) -> int:
-        return self.session.query(ProductModel).count()
+        predicates = filter_predicates(self.session, self.lookups, filters)
+        if predicates is None:
+            return []
+        rows = fetch_page(
+            lambda stmt: self.session.scalars(stmt).all(),
+            select(ProductModel).options(*_RELATIONS).where(*predicates),
+            sort_by or "id",
+            descending,
+            offset,
+            limit,
+            after,
+        )
+        return self._to_entities(rows)
+
+    def count(self, filters: Optional[ProductFilters] = None) -> int:
+        predicates = filter_predicates(self.session, self.lookups, filters)
+        if predicates is None:
+            return 0
+        return self.session.query(ProductModel).filter(*predicates).count()
 
     # --- UPDATE ---
     def update(self, product: ProductDM) -> ProductDM:
@@ -71,82 +129,232 @@ class ProductRepository(ProductRepositoryProtocol):
         model.description = product.description
 
         if product.price is not None:
-            self._add_price(model.id, product.price, product.currency)
+            self._add_price(model, product.price, product.currency)
 
         if product.brand:
-            self._ensure_brand(product, model)
+            model.brand_id = self._ensure_brand(product.brand)
 
         if product.categories is not None:
-            model.categories.clear()
-            self._ensure_categories(product, model)
+            self.session.execute(
+                delete(product_categories).where(
+                    product_categories.c.product_id == model.id
+                )
+            )
+            if product.categories:
+                category_ids = self._ensure_categories(product.categories)
+                self._link_categories(model.id, category_ids)
 
         if product.media_urls is not None:
-            model.media.clear()
-            self._ensure_media(product, model)
+            self.session.execute(delete(Media).where(Media.product_id == model.id))
+            if product.media_urls:
+                self._insert_media(model.id, product.media_urls)
 
-        self.session.commit()
-        return self._to_entity(model)
+        self.uow.flush()
+        self.session.execute(touch(ProductModel.id == model.id))
+        self._publish(PRODUCT_UPDATED, model.id)
+        return self._reload(model.id)
 
     # --- DELETE ---
     def delete(self, product_id: int) -> None:
-        model = self.session.query(ProductModel).filter_by(id=product_id).first()
-        if model is None:
+        # склад, цены, медиа, связи с категориями и тегами, отзывы
+        # и варианты удаляет ON DELETE CASCADE
+        deleted = self.session.scalar(
+            delete(ProductModel)
+            .where(ProductModel.id == product_id)
+            .returning(ProductModel.id)
+        )
+        if deleted is None:
             raise ValueError("Продукт не найден")
-        self.session.delete(model)
-        self.session.commit()
+        self.uow.flush()
+        self._publish(PRODUCT_DELETED, product_id)
+
+    # --- Склад ---
+    def increment_stock(self, product_id: int, amount: int) -> Optional[int]:
+        quantity = self._update_stock(
+            update(Inventory)
+            .where(Inventory.id == self._stock_row(product_id))
+            .values(quantity=Inventory.quantity + amount)
+        )
+        if quantity is None and self.exists(product_id):
+            # у продукта ещё нет складской строки — заводим её
+            self._insert_stock(product_id, amount)
+            quantity = amount
+        if quantity is not None:
+            self._publish(PRODUCT_STOCK_CHANGED, product_id)
+        return quantity
+
+    def decrement_stock(self, product_id: int, amount: int) -> Optional[int]:
+        """
+        Списание одним условным UPDATE: проверка остатка и изменение
+        атомарны на уровне строки, явные блокировки не нужны.
+        None — остатка не хватает (или продукта нет).
+        """
+        quantity = self._update_stock(
+            update(Inventory)
+            .where(
+                Inventory.id == self._stock_row(product_id),
+                Inventory.quantity >= amount,
+            )
+            .values(quantity=Inventory.quantity - amount)
+        )
+        if quantity is not None:
+            self._publish(PRODUCT_STOCK_CHANGED, product_id)
+        return quantity
+
+    def set_stock(self, product_id: int, quantity: int) -> None:
+        updated = self._update_stock(
+            update(Inventory)
+            .where(Inventory.id == self._stock_row(product_id))
+            .values(quantity=quantity)
+        )
+        if updated is None:
+            self._insert_stock(product_id, quantity)
+        self._publish(PRODUCT_STOCK_CHANGED, product_id)
+
+    def exists(self, product_id: int) -> bool:
+        return bool(
+            self.session.scalar(
+                select(exists().where(ProductModel.id == product_id))
+            )
+        )
 
     # --- Вспомогательные методы ---
+    def _publish(self, topic: str, product_id: int) -> None:
+        """
+        Событие об изменении продукта в outbox той же транзакцией; кэши
+        и прочих подписчиков обновляет drain_outbox после коммита.
+        """
+        self.outbox.publish(topic, str(product_id))
+
     def _add_price(
-        self, 
-        product_id: int, 
-        price_value: float, 
+        self,
+        model: ProductModel,
+        price_value: float,
         currency: Optional[str]
     ) -> None:
+        """
+        Пишет запись в историю цен и синхронизирует денормализованную
+        current_price/current_currency. Неизменившаяся цена не дублируется.
+        """
         currency = currency or "USD"
-        price = Price(product_id=product_id, price=price_value, currency=currency)
-        self.session.add(price)
-        self.session.commit()
-
-    def _ensure_brand(self, product: ProductDM, model: ProductModel) -> None:
-        brand = self.session.query(Brand).filter_by(name=product.brand).first()
-        if not brand:
-            brand = Brand(name=product.brand)
-            self.session.add(brand)
-            self.session.commit()
-        model.brand = brand
-
-    def _ensure_categories(self, product: ProductDM, model: ProductModel) -> None:
-        for cat_name in product.categories or []:
-            category = self.session.query(Category).filter_by(name=cat_name).first()
-            if not category:
-                category = Category(name=cat_name)
-                self.session.add(category)
-                self.session.commit()
-            model.categories.append(category)
-
-    def _ensure_media(self, product: ProductDM, model: ProductModel) -> None:
-        for url in product.media_urls or []:
-            media = Media(product_id=model.id, type="image", url=url)
-            self.session.add(media)
-        self.session.commit()
+        if (model.current_price, model.current_currency) == (price_value, currency):
+            return
+        model.current_price = price_value
+        model.current_currency = currency
+        self.session.add(Price(product=model, price=price_value, currency=currency))
 
-    # --- Преобразование ORM -> доменная сущность ---
-    def _to_entity(self, model: ProductModel) -> ProductDM:
-        latest_price = (
-            self.session.query(Price)
-            .filter(Price.product_id == model.id)
-            .order_by(desc(Price.valid_from))
-            .first()
+    def _update_stock(self, stmt: Update) -> Optional[int]:
+        """
+        UPDATE склада и версия продукта одним запросом: изменённая строка
+        inventory из CTE сразу поднимает version/updated_at своего продукта.
+        Возвращает новый остаток или None, если строка не подошла.
+        """
+        changed = stmt.returning(Inventory.product_id, Inventory.quantity).cte()
+        return self.session.scalar(
+            touch(ProductModel.id == changed.c.product_id).returning(
+                changed.c.quantity
+            )
+        )
+
+    def _insert_stock(self, product_id: int, quantity: int) -> None:
+        self.session.execute(
+            insert(Inventory).values(product_id=product_id, quantity=quantity)
+        )
+        self.session.execute(touch(ProductModel.id == product_id))
+
+    def _stock_row(self, product_id: int) -> ScalarSelect[int]:
+        """Складская строка, которую отдаёт in_stock, — первая по id."""
+        return (
+            select(Inventory.id)
+            .where(Inventory.product_id == product_id)
+            .order_by(Inventory.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+
+    def _ensure_brand(self, name: str) -> int:
+        return self._ensure_names("brand", [name])[name]
+
+    def _ensure_categories(self, names: List[str]) -> List[int]:
+        ids = self._ensure_names("category", names)
+        return [ids[n] for n in dict.fromkeys(names)]
+
+    def _ensure_names(self, kind: LookupKind, names: List[str]) -> dict[str, int]:
+        """
+        Разрешает список имён в id. Известные берутся из LookupCache,
+        остальные — за два запроса независимо от их числа:
+        INSERT ... ON CONFLICT DO NOTHING RETURNING создаёт недостающие,
+        SELECT добирает те, что уже были (в т.ч. созданные конкурентно).
+        """
+        unique = list(dict.fromkeys(names))
+        ids = self.lookups.get_many(kind, unique)
+        missing = [n for n in unique if n not in ids]
+        if not missing:
+            return ids
+
+        model = LOOKUP_MODELS[kind]
+        inserted = {
+            row.name: row.id
+            for row in self.session.execute(
+                pg_insert(model)
+                .values([{"name": n} for n in missing])
+                .on_conflict_do_nothing(index_elements=[model.name])
+                .returning(model.id, model.name)
+            )
+        }
+        if inserted:
+            # новые строки попадают в кэш только после коммита
+            self.uow.on_commit(partial(self.lookups.put_many, kind, inserted))
+        if rest := [n for n in missing if n not in inserted]:
+            existing = {
+                row.name: row.id
+                for row in self.session.execute(
+                    select(model.id, model.name).where(model.name.in_(rest))
+                )
+            }
+            self.lookups.put_many(kind, existing)
+            ids |= existing
+        return ids | inserted
+
+    def _link_categories(self, product_id: int, category_ids: List[int]) -> None:
+        self.session.execute(
+            insert(product_categories),
+            [{"product_id": product_id, "category_id": cid} for cid in category_ids],
+        )
+
+    def _insert_media(self, product_id: int, urls: List[str]) -> None:
+        self.session.execute(
+            insert(Media),
+            [{"product_id": product_id, "type": "image", "url": url} for url in urls],
+        )
+
+    def _reload(self, product_id: int) -> ProductDM:
+        """Перечитывает продукт со связями после записи в рамках транзакции."""
+        model = (
+            self._with_relations(self.session.query(ProductModel))
+            .populate_existing()
+            .filter_by(id=product_id)
+            .one()
         )
+        return self._to_entity(model)
+
+    # --- Пакетная загрузка связей ---
+    def _with_relations(self, query: Query[ProductModel]) -> Query[ProductModel]:
+        return query.options(*_RELATIONS)
 
+    # --- Преобразование ORM -> доменная сущность ---
+    def _to_entities(self, models: List[ProductModel]) -> List[ProductDM]:
+        return [self._to_entity(m) for m in models]
+
+    def _to_entity(self, model: ProductModel) -> ProductDM:
         return ProductDM(
             id=model.id,
             name=model.name,
-            price=latest_price.price if latest_price else None,
+            price=model.current_price,
             description=model.description,
             brand=model.brand.name if model.brand else None,
             categories=[c.name for c in model.categories] if model.categories else [],
             in_stock=model.inventory[0].quantity if model.inventory else None,
             media_urls=[m.url for m in model.media] if model.media else [],
-            currency=latest_price.currency if latest_price else "USD",
+            currency=model.current_currency or "USD",
         )
@@ -0,0 +1,55 @@
+from sqlalchemy import ColumnElement, Update, event, func, select, update
+from sqlalchemy.orm import Session, UOWTransaction, sessionmaker
+from sqlalchemy.orm.attributes import get_history
+
+from products.infrastructure.models import (
+    Brand,
+    Category,
+    ProductModel,
+    product_categories,
+)
+
+
+def touch(*where: ColumnElement[bool]) -> Update:
+    """UPDATE, поднимающий version и updated_at подходящих продуктов."""
+    return (
+        update(ProductModel)
+        .where(*where)
+        .values(version=ProductModel.version + 1, updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def track_lookup_renames(session_maker: sessionmaker[Session]) -> None:
+    """
+    Имена бренда и категорий входят в карточку продукта, поэтому их
+    переименование через ORM поднимает версию всех затронутых продуктов
+    в той же транзакции — иначе клиенты с прежним ETag получали бы 304.
+    """
+    event.listen(session_maker, "after_flush", _touch_renamed)
+
+
+def _touch_renamed(session: Session, flush_context: UOWTransaction) -> None:
+    brand_ids: list[int] = []
+    category_ids: list[int] = []
+    for obj in session.dirty:
+        if not isinstance(obj, (Brand, Category)):
+            continue
+        if not get_history(obj, "name").has_changes():
+            continue
+        (brand_ids if isinstance(obj, Brand) else category_ids).append(obj.id)
+
+    # flush уже идёт: Core-запросы через соединение, без повторного autoflush
+    connection = session.connection()
+    if brand_ids:
+        connection.execute(touch(ProductModel.brand_id.in_(brand_ids)))
+    if category_ids:
+        connection.execute(
+            touch(
+                ProductModel.id.in_(
+                    select(product_categories.c.product_id).where(
+                        product_categories.c.category_id.in_(category_ids)
+                    )
+                )
+            )
+        )
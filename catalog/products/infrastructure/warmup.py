@@ -0,0 +1,135 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from config import Config, WarmupConfig
+from dishka import Container
+from redis import Redis
+
+from ..application.interactors import (
+    CachedListProductsInteractor,
+    WarmProductDetailsInteractor,
+)
+from ..application.interfaces import HotProductsProtocol
+from ..application.types import ProductFilters
+
+logger = logging.getLogger(__name__)
+
+# один прогрев на деплой, а не на каждый воркер
+WARMUP_LOCK = "warmup:catalog:lock"
+WARMUP_LOCK_TTL = 600
+
+# снимает лок, только если он всё ещё наш (не истёк и не перехвачен)
+_RELEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class _Pacer:
+    """Равномерный темп на все потоки: не больше rate запусков в секунду."""
+
+    def __init__(self, rate: float) -> None:
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self._interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class CatalogWarmer:
+    """
+    Прогрев кэшей каталога после деплоя или сброса Redis: карточки
+    горячих id (явный список или статистика обращений) и первые страницы
+    списка. Каждая пачка — отдельный REQUEST-скоуп со своей сессией;
+    параллельность ограничена concurrency, а частота запросов к БД — rate.
+    """
+
+    def __init__(
+        self,
+        container: Container,
+        hot: HotProductsProtocol,
+        config: WarmupConfig,
+    ) -> None:
+        self._container = container
+        self._hot = hot
+        self._config = config
+
+    def warm(self, product_ids: Optional[List[int]] = None) -> Tuple[int, int]:
+        """Возвращает (прогретые карточки, прогретые страницы списка)."""
+        config = self._config
+        if product_ids is None:
+            product_ids = self._hot.top(config.top)
+        batches = [
+            product_ids[i:i + config.batch_size]
+            for i in range(0, len(product_ids), config.batch_size)
+        ]
+        pacer = _Pacer(config.rate)
+        with ThreadPoolExecutor(max_workers=config.concurrency) as pool:
+            details = sum(pool.map(lambda b: self._details(pacer, b), batches))
+            # страницы глубже list_cached_pages не кэшируются, греть их незачем
+            cached = self._container.get(Config).cache.list_cached_pages
+            pages = range(1, min(config.list_pages, cached) + 1)
+            listed = sum(pool.map(lambda p: self._page(pacer, p), pages))
+        return details, listed
+
+    def _details(self, pacer: _Pacer, batch: List[int]) -> int:
+        pacer.wait()
+        with self._container() as request:
+            return request.get(WarmProductDetailsInteractor).execute(batch)
+
+    def _page(self, pacer: _Pacer, page: int) -> int:
+        pacer.wait()
+        with self._container() as request:
+            # те же параметры, что у products_view без фильтров, —
+            # иначе ключ страницы не совпадёт с ключом реальных запросов
+            request.get(CachedListProductsInteractor).execute(
+                page=page,
+                page_size=self._config.list_page_size,
+                filters=ProductFilters(),
+            )
+        return 1
+
+
+def warm_on_startup(container: Container) -> None:
+    """
+    Хук старта приложения: при CACHE_WARM_ON_STARTUP прогрев идёт
+    в фоновом потоке и не задерживает запуск. Прогревает один воркер —
+    тот, что первым взял лок в Redis.
+    """
+    config = container.get(Config).warmup
+    if not config.on_startup:
+        return
+    redis = container.get(Redis)
+    token = uuid.uuid4().hex
+    if not redis.set(WARMUP_LOCK, token, nx=True, ex=WARMUP_LOCK_TTL):
+        return
+    warmer = CatalogWarmer(container, container.get(HotProductsProtocol), config)
+    release = redis.register_script(_RELEASE)
+
+    def run() -> None:
+        # после успешного прогрева лок остаётся до истечения TTL, чтобы
+        # остальные воркеры деплоя не грели повторно; после ошибки его
+        # снимаем — иначе прогрев не повторится до конца TTL
+        try:
+            details, listed = warmer.warm()
+        except Exception:
+            logger.exception("catalog warmup failed")
+            release(keys=[WARMUP_LOCK], args=[token])
+        else:
+            logger.info(
+                "catalog warmup done: %d details, %d list pages", details, listed
+            )
+
+    threading.Thread(target=run, name="catalog-warmup", daemon=True).start()
@@ -0,0 +1,19 @@
+from container import container
+from django.core.management.base import BaseCommand
+
+from products.application.interactors import ProductCacheStatsInteractor
+
+
+class Command(BaseCommand):
+    help = (
+        "Печатает счётчики попаданий и промахов кэша карточек. Наружу "
+        "по HTTP они не отдаются."
+    )
+
+    def handle(self, *args, **options) -> None:
+        with container() as request:
+            stats = request.get(ProductCacheStatsInteractor).execute()
+        # l1_hits у каждого воркера свои, у этого процесса их нет
+        stats.pop("l1_hits", None)
+        for name, value in sorted(stats.items()):
+            self.stdout.write(f"{name}: {value}")
@@ -0,0 +1,50 @@
+from pathlib import Path
+from typing import List, Optional
+
+import msgspec
+from config import Config
+from container import container
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from products.application.interfaces import HotProductsProtocol
+from products.infrastructure.warmup import CatalogWarmer
+
+
+class Command(BaseCommand):
+    help = (
+        "Прогревает кэш карточек и первых страниц списка продуктов. "
+        "Без --ids берёт самые запрашиваемые id из статистики обращений."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--ids", help="id через запятую")
+        parser.add_argument("--ids-file", type=Path, help="файл с id по строкам")
+        parser.add_argument("--top", type=int)
+        parser.add_argument("--batch-size", type=int)
+        parser.add_argument("--concurrency", type=int)
+        parser.add_argument("--rate", type=float, help="запросов к БД в секунду")
+        parser.add_argument("--list-pages", type=int)
+
+    def handle(self, *args, **options) -> None:
+        overrides = {
+            field: options[field]
+            for field in ("top", "batch_size", "concurrency", "rate", "list_pages")
+            if options[field] is not None
+        }
+        config = msgspec.structs.replace(container.get(Config).warmup, **overrides)
+        warmer = CatalogWarmer(container, container.get(HotProductsProtocol), config)
+        details, pages = warmer.warm(self._product_ids(options))
+        self.stdout.write(f"warmed {details} product details, {pages} list pages")
+
+    def _product_ids(self, options: dict) -> Optional[List[int]]:
+        raw: List[str] = []
+        if options["ids"]:
+            raw += options["ids"].split(",")
+        if options["ids_file"]:
+            raw += options["ids_file"].read_text().split()
+        if not raw:
+            return None
+        try:
+            return list(dict.fromkeys(int(i) for i in raw if i.strip()))
+        except ValueError as e:
+            raise CommandError(f"Некорректный id: {e}")
@@ -0,0 +1,7 @@
+from django.conf import settings
+
+
+def pytest_configure() -> None:
+    # SessionBase читает настройки сериализатора; остальное тестам не нужно
+    if not settings.configured:
+        settings.configure()
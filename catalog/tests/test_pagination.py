@@ -0,0 +1,52 @@
+import pytest
+from products.application.pagination import (
+    ProductCursor,
+    decode_cursor,
+    encode_cursor,
+)
+from products.controllers.schemas import ProductQueryParams, ValidationError
+
+
+def test_cursor_round_trip() -> None:
+    cursor = ProductCursor("price", True, 9.5, 42)
+
+    assert decode_cursor(encode_cursor(cursor)) == cursor
+
+
+@pytest.mark.parametrize("value", ["not a cursor", "!!!", "WzEsMiwz"])
+def test_tampered_cursor_is_rejected(value: str) -> None:
+    with pytest.raises(ValueError):
+        decode_cursor(value)
+
+
+def test_cursor_key_must_match_sort_field() -> None:
+    forged = encode_cursor(ProductCursor("name", False, 10, 42))
+
+    with pytest.raises(ValueError, match="does not match sort field"):
+        decode_cursor(forged)
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        {"sort_by": "name"},
+        {"sort_by": "price", "descending": "true"},
+        {},
+    ],
+)
+def test_cursor_for_other_sort_is_rejected(raw: dict[str, str]) -> None:
+    cursor = encode_cursor(ProductCursor("price", False, 9.5, 42))
+
+    with pytest.raises(ValidationError) as error:
+        ProductQueryParams.from_raw({**raw, "cursor": cursor})
+    assert error.value.field == "cursor"
+
+
+def test_matching_cursor_is_accepted() -> None:
+    cursor = ProductCursor("price", False, 9.5, 42)
+
+    params = ProductQueryParams.from_raw(
+        {"sort_by": "price", "cursor": encode_cursor(cursor)}
+    )
+
+    assert params.after == cursor
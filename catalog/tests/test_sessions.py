@@ -0,0 +1,138 @@
+import uuid
+
+import fakeredis
+import msgspec
+import pytest
+from main.domain.entities import SessionData
+from main.infrastructure.sessions import (
+    CustomSession,
+    GuestSessionBackend,
+    RedisSessionBackend,
+)
+
+
+@pytest.fixture
+def redis() -> fakeredis.FakeRedis:
+    return fakeredis.FakeRedis()
+
+
+@pytest.fixture
+def backend(redis: fakeredis.FakeRedis) -> RedisSessionBackend:
+    return RedisSessionBackend(redis)
+
+
+def _store_legacy(
+    redis: fakeredis.FakeRedis, sid: uuid.UUID, data: SessionData
+) -> None:
+    redis.set(sid.hex, b"\x01" + msgspec.msgpack.encode(data), ex=3600)
+
+
+def _session(backend: RedisSessionBackend, sid: uuid.UUID) -> CustomSession:
+    return CustomSession(sid, True, backend, uuid.uuid4)
+
+
+@pytest.mark.parametrize("read_first", [True, False])
+def test_first_write_migrates_legacy_session(
+    redis: fakeredis.FakeRedis, backend: RedisSessionBackend, read_first: bool
+) -> None:
+    sid, user_id = uuid.uuid4(), uuid.uuid4()
+    _store_legacy(redis, sid, SessionData(user_id=user_id, data={"cart": [1, 2]}))
+
+    session = _session(backend, sid)
+    if read_first:
+        assert session.get("cart") == [1, 2]
+    session["lang"] = "ru"
+    session.save()
+
+    reloaded = _session(backend, sid)
+    assert reloaded.get("cart") == [1, 2]
+    assert reloaded.get("lang") == "ru"
+    assert reloaded.user_id == user_id
+    assert not redis.exists(sid.hex)
+    assert redis.sismember(f"session:user:{user_id.hex}", sid.hex)
+
+
+def test_flush_writes_only_changed_fields(
+    redis: fakeredis.FakeRedis, backend: RedisSessionBackend
+) -> None:
+    sid, user_id = uuid.uuid4(), uuid.uuid4()
+    backend.create(sid, SessionData(user_id=user_id, data={"cart": [1], "lang": "en"}))
+
+    backend.flush(sid, {"lang": "ru"}, ["cart"])
+
+    assert backend.read(sid) == SessionData(user_id=user_id, data={"lang": "ru"})
+    assert redis.ttl(f"session:{sid.hex}") == RedisSessionBackend.ttl
+
+
+def test_revoke_user_covers_read_legacy_session(
+    redis: fakeredis.FakeRedis, backend: RedisSessionBackend
+) -> None:
+    sid, user_id = uuid.uuid4(), uuid.uuid4()
+    _store_legacy(redis, sid, SessionData(user_id=user_id, data={"cart": [1]}))
+    assert backend.read(sid) == SessionData(user_id=user_id, data={"cart": [1]})
+
+    assert backend.revoke_user(user_id) == 1
+    assert backend.read(sid) is None
+
+
+def test_legacy_guest_session_is_not_indexed(
+    redis: fakeredis.FakeRedis, backend: RedisSessionBackend
+) -> None:
+    sid = uuid.uuid4()
+    _store_legacy(redis, sid, SessionData(user_id=sid, data={"cart": [1]}))
+
+    assert backend.read(sid) == SessionData(user_id=sid, data={"cart": [1]})
+    assert not redis.exists(f"session:user:{sid.hex}")
+
+
+def test_user_index_expires_with_sessions(
+    redis: fakeredis.FakeRedis, backend: RedisSessionBackend
+) -> None:
+    user_id, live, gone = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    index = f"session:user:{user_id.hex}"
+    redis.sadd(index, gone.hex)
+    backend.create(live, SessionData(user_id=user_id, data={}))
+
+    assert redis.smembers(index) == {live.hex.encode()}
+    assert redis.ttl(index) >= RedisSessionBackend.ttl
+
+    redis.expire(index, 10)
+    backend.flush(live, {"lang": "ru"}, [])
+    assert redis.ttl(index) >= redis.ttl(f"session:{live.hex}")
+
+
+@pytest.mark.parametrize("read_first", [True, False])
+def test_write_after_revoke_does_not_resurrect_session(
+    redis: fakeredis.FakeRedis, backend: RedisSessionBackend, read_first: bool
+) -> None:
+    sid, user_id = uuid.uuid4(), uuid.uuid4()
+    backend.create(sid, SessionData(user_id=user_id, data={"cart": [1]}))
+    session = _session(backend, sid)
+    if read_first:
+        assert session.get("cart") == [1]
+
+    backend.revoke_user(user_id)
+    session["lang"] = "ru"
+    session.save()
+
+    assert session.revoked
+    assert not redis.exists(f"session:{sid.hex}")
+    assert backend.flush(sid, {"lang": "ru"}, []) is False
+    assert backend.read(sid) is None
+
+
+def test_guest_write_uses_guest_ttl_without_index(
+    redis: fakeredis.FakeRedis,
+) -> None:
+    guests = GuestSessionBackend(redis)
+    session = CustomSession(None, False, guests, uuid.uuid4)
+    session["cart"] = [1]
+    session.save()
+
+    sid = uuid.UUID(session.session_key)
+    assert 0 < redis.ttl(f"session:{sid.hex}") <= GuestSessionBackend.ttl
+    assert not redis.hexists(f"session:{sid.hex}", "uid")
+    assert not redis.keys("session:user:*")
+    reloaded = CustomSession(sid, True, guests, uuid.uuid4)
+    assert reloaded.get("cart") == [1]
+    assert reloaded.user_id == sid
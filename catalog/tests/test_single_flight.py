@@ -0,0 +1,99 @@
+import time
+import uuid
+from typing import Callable
+
+import fakeredis
+import pytest
+from config import CachePolicy
+from main.infrastructure.cache import SingleFlightCache
+
+
+@pytest.fixture
+def redis() -> fakeredis.FakeRedis:
+    return fakeredis.FakeRedis()
+
+
+def _counting(
+    value: bytes, delay: float = 0.0
+) -> tuple[Callable[[], bytes], list[bytes]]:
+    calls: list[bytes] = []
+
+    def compute() -> bytes:
+        time.sleep(delay)
+        calls.append(value)
+        return value
+
+    return compute, calls
+
+
+def _hold_lock(redis: fakeredis.FakeRedis, cache: SingleFlightCache) -> None:
+    redis.set(f"{cache.namespace}:lock:k", uuid.uuid4().hex, px=5000)
+
+
+def test_lock_computes_once_while_fresh(redis: fakeredis.FakeRedis) -> None:
+    cache = SingleFlightCache("t", redis, CachePolicy(strategy="lock"))
+    compute, calls = _counting(b"v")
+
+    assert cache.get_or_compute("k", compute) == b"v"
+    assert cache.get_or_compute("k", compute) == b"v"
+    assert calls == [b"v"]
+    assert not redis.exists("t:lock:k")
+
+
+def test_lock_serves_stale_value_while_another_worker_recomputes(
+    redis: fakeredis.FakeRedis,
+) -> None:
+    cache = SingleFlightCache("t", redis, CachePolicy(strategy="lock"))
+    cache.get_or_compute("k", lambda: b"old")
+    cache.expire_all()
+    _hold_lock(redis, cache)
+    compute, calls = _counting(b"new")
+
+    assert cache.get_or_compute("k", compute) == b"old"
+    assert calls == []
+
+
+def test_lock_owner_recomputes_expired_value(redis: fakeredis.FakeRedis) -> None:
+    cache = SingleFlightCache("t", redis, CachePolicy(strategy="lock"))
+    cache.get_or_compute("k", lambda: b"old")
+    cache.expire_all()
+
+    assert cache.get_or_compute("k", lambda: b"new") == b"new"
+    assert cache.get_or_compute("k", lambda: b"newer") == b"new"
+
+
+def test_lock_waits_for_missing_value_then_computes(
+    redis: fakeredis.FakeRedis,
+) -> None:
+    policy = CachePolicy(strategy="lock", lock_ttl=0.2)
+    cache = SingleFlightCache("t", redis, policy)
+    _hold_lock(redis, cache)
+    compute, calls = _counting(b"v")
+
+    started = time.monotonic()
+    assert cache.get_or_compute("k", compute) == b"v"
+    assert time.monotonic() - started >= policy.lock_ttl
+    assert calls == [b"v"]
+
+
+def test_xfetch_keeps_value_without_early_recompute(
+    redis: fakeredis.FakeRedis,
+) -> None:
+    cache = SingleFlightCache("t", redis, CachePolicy(strategy="xfetch", beta=0))
+    compute, calls = _counting(b"v", delay=0.01)
+
+    for _ in range(5):
+        assert cache.get_or_compute("k", compute) == b"v"
+    assert calls == [b"v"]
+
+
+def test_xfetch_recomputes_expensive_value_early(
+    redis: fakeredis.FakeRedis,
+) -> None:
+    # огромный beta: сдвиг времени перекрывает весь ttl, пересчёт
+    # начинается задолго до истечения ключа
+    cache = SingleFlightCache("t", redis, CachePolicy(strategy="xfetch", beta=1e9))
+    cache.get_or_compute("k", _counting(b"old", delay=0.01)[0])
+
+    assert cache.get_or_compute("k", lambda: b"new") == b"new"
+    assert redis.ttl("t:k") > 0
@@ -0,0 +1,31 @@
+from typing import Optional
+from unittest.mock import Mock
+
+import pytest
+from products.application.types import PRODUCT_STOCK_CHANGED
+from products.infrastructure.repositories import ProductRepository
+from sqlalchemy.dialects import postgresql
+
+
+def _repository(quantity: Optional[int]) -> tuple[ProductRepository, Mock, Mock]:
+    # условный UPDATE ... RETURNING отдаёт None, если строка не подошла
+    session, outbox = Mock(), Mock()
+    session.scalar.return_value = quantity
+    return ProductRepository(session, Mock(), Mock(), outbox), session, outbox
+
+
+def test_decrement_stock_returns_none_when_stock_is_short() -> None:
+    repo, session, outbox = _repository(None)
+
+    assert repo.decrement_stock(1, 5) is None
+    outbox.publish.assert_not_called()
+    sql = str(session.scalar.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "inventory.quantity >= " in sql
+
+
+@pytest.mark.parametrize("left", [0, 3])
+def test_decrement_stock_returns_new_quantity(left: int) -> None:
+    repo, _, outbox = _repository(left)
+
+    assert repo.decrement_stock(1, 5) == left
+    outbox.publish.assert_called_once_with(PRODUCT_STOCK_CHANGED, "1")
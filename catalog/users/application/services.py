@@ -2,10 +2,9 @@ import datetime
 from typing import cast
 from uuid import UUID
 
+from main.application.interfaces import UserSessionBackendProtocol, UUIDGenerator
 from redis import Redis
 
-from catalog.main.application.interfaces import UUIDGenerator
-
 from ..domain.entities import UserDomain, UserRole, UserStatus
 from .errors import (
     AuthError,
@@ -24,12 +23,14 @@ class AccountService:
         repo: UserRepositoryProtocol, 
         redis_client: Redis,
         password_hasher: PasswordHasherProtocol,
-        uuid_generator: UUIDGenerator
+        uuid_generator: UUIDGenerator,
+        sessions: UserSessionBackendProtocol,
     ) -> None:
         self._repo = repo
         self._redis = redis_client
         self._password_hasher = password_hasher
         self._uuid_generator = uuid_generator
+        self._sessions = sessions
 
     # --- Регистрация ---
     def register_user(self, username: str, email: str, password: str) -> UserDomain:
@@ -108,6 +109,7 @@ class AccountService:
 
         user.status = UserStatus.SUSPENDED
         if updated := self._repo.update(user.user_id, user):
+            self.revoke_sessions(user.user_id)
             return updated
         raise NotFoundError("Не удалось заблокировать пользователя")
 
@@ -142,10 +144,12 @@ class AccountService:
             user.status = UserStatus.DELETED
             user.deleted_at = datetime.datetime.now(datetime.timezone.utc)
             if updated := self._repo.update(user_id, user):
+                self.revoke_sessions(user_id)
                 return updated
             else:
                 raise NotFoundError("Не удалось удалить клиента")
         elif deleted := self._repo.delete(user_id):
+            self.revoke_sessions(user_id)
             return deleted
         else:
             raise NotFoundError("Не удалось удалить пользователя")
@@ -185,8 +189,12 @@ class AccountService:
             self._repo.delete(u.user_id)
         return len(users)
 
+    # --- Сессии ---
+    def revoke_sessions(self, user_id: UUID) -> int:
+        """Выход со всех устройств: все сессии пользователя за один вызов."""
+        return self._sessions.revoke_user(user_id)
+
     # --- Смена роли ---
-# --- Смена роли ---
     def change_role(
         self,
         requester_id: UUID,
@@ -229,6 +237,8 @@ class AccountService:
             raise AuthError("Старый пароль неверен")
         user.password_hash = new_hash
         if updated := self._repo.update(user_id, user):
+            # сессии, открытые со старым паролем, больше не действуют
+            self.revoke_sessions(user_id)
             return updated
         else:
             raise NotFoundError("Не удалось обновить пароль")
@@ -3,7 +3,7 @@ from uuid import UUID
 
 import sqlalchemy as sa
 from main.infrastructure.db import Base
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column
 
 from users.domain.entities import UserRole, UserStatus
 
@@ -27,9 +27,3 @@ class User(Base):
     created_at: Mapped[datetime.datetime] = mapped_column(
         sa.DateTime, default=lambda: datetime.datetime.now(datetime.timezone.utc)
     )
-
-    reviews = relationship(
-        "Review", 
-        back_populates="user", 
-        cascade="all, delete-orphan"
-    )